@@ -1,13 +1,11 @@
-import math
 import pygame
 import random
 import heapq
-import nltk
-from nltk.corpus import words
 import sys
+from ui import draw_gradient_background
+# Prebuilt by `python dictionary.py`, memory-mapped on the first lookup
+from dictionary import valid_words
 
-nltk.download('words')
-valid_words = set(w.lower() for w in words.words())
 short_valid_words = {
     "cat", "dog", "car", "sun", "run", "red", "man", "fun", "cup", "map", "top", "toy", "box", "fox", "log",
     "yes", "hat", "bat", "rat", "mat", "pot", "pen", "can", "win", "bus", "net", "dot", "fan", "bed", "egg",
@@ -72,44 +70,16 @@ for _ in range(50):
     })
 
 def choose_mode():
-    import math
-    screen_rect = screen.get_rect()
     msg = BIG_FONT.render("Choose Game Mode", True, WHITE)
     opt_texts = ["AI vs Human", "AI vs Human vs Human"]
     selected = 0
     clock = pygame.time.Clock()
     t = 0  # time variable for animation
 
-    def draw_gradient_background(tick):
-        top_color = (40, 0, 80)    # deep indigo
-        mid_color = (128, 0, 128)  # vibrant purple
-        bottom_color = (30, 144, 255)  # soft sky blue
-
-        height = screen_rect.height
-        for y in range(height):
-            blend = y / height
-            wave = math.sin(tick + y * 0.01) * 0.1  # gentle animation
-            blend += wave
-            blend = max(0, min(blend, 1))  # clamp to [0,1]
-
-            if blend < 0.5:
-                ratio = blend * 2
-                r = int(top_color[0] * (1 - ratio) + mid_color[0] * ratio)
-                g = int(top_color[1] * (1 - ratio) + mid_color[1] * ratio)
-                b = int(top_color[2] * (1 - ratio) + mid_color[2] * ratio)
-            else:
-                ratio = (blend - 0.5) * 2
-                r = int(mid_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-                g = int(mid_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-                b = int(mid_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-
-            pygame.draw.line(screen, (r, g, b), (0, y), (screen_rect.width, y))
-
-
     while True:
         clock.tick(60)
         t += 0.05
-        draw_gradient_background(t)
+        draw_gradient_background(screen, t)
         screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, HEIGHT // 2 - 100))
 
         for i, text in enumerate(opt_texts):
@@ -270,29 +240,7 @@ def show_message(text, sub=""):
     tick = pygame.time.get_ticks() / 500  # animate the gradient over time
 
     # --- Gradient background like menu ---
-    top_color = (40, 0, 80)
-    mid_color = (128, 0, 128)
-    bottom_color = (30, 144, 255)
-    height = screen.get_height()
-
-    for y in range(height):
-        blend = y / height
-        wave = math.sin(tick + y * 0.01) * 0.1
-        blend += wave
-        blend = max(0, min(blend, 1))
-
-        if blend < 0.5:
-            ratio = blend * 2
-            r = int(top_color[0] * (1 - ratio) + mid_color[0] * ratio)
-            g = int(top_color[1] * (1 - ratio) + mid_color[1] * ratio)
-            b = int(top_color[2] * (1 - ratio) + mid_color[2] * ratio)
-        else:
-            ratio = (blend - 0.5) * 2
-            r = int(mid_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-            g = int(mid_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-            b = int(mid_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-
-        pygame.draw.line(screen, (r, g, b), (0, y), (WIDTH, y))
+    draw_gradient_background(screen, tick)
 
     # --- Render message text ---
     msg = BIG_FONT.render(text, True, WHITE)
@@ -305,35 +253,11 @@ def show_message(text, sub=""):
     pygame.display.flip()
 
 def show_scorecard(player_score, ai_score, player2_score=None):
-    def draw_gradient_background(tick):
-        top_color = (40, 0, 80)    # deep indigo
-        mid_color = (128, 0, 128)  # vibrant purple
-        bottom_color = (30, 144, 255)  # soft sky blue
-
-        height = screen.get_height()
-        for y in range(height):
-            blend = y / height
-            wave = math.sin(tick + y * 0.01) * 0.05  # more subtle animation
-            blend += wave
-            blend = max(0, min(blend, 1))  # clamp to [0,1]
-
-            if blend < 0.5:
-                ratio = blend * 2
-                r = int(top_color[0] * (1 - ratio) + mid_color[0] * ratio)
-                g = int(top_color[1] * (1 - ratio) + mid_color[1] * ratio)
-                b = int(top_color[2] * (1 - ratio) + mid_color[2] * ratio)
-            else:
-                ratio = (blend - 0.5) * 2
-                r = int(mid_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-                g = int(mid_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-                b = int(mid_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-
-            pygame.draw.line(screen, (r, g, b), (0, y), (screen.get_width(), y))
-
-
+    clock = pygame.time.Clock()
     tick = 0
     while True:
-        draw_gradient_background(tick)
+        clock.tick(60)
+        draw_gradient_background(screen, tick, wave=0.05)
         tick += 0.05
 
         game_over_text = BIG_FONT.render("Game Over", True, RED)
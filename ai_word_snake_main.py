@@ -1,22 +1,30 @@
-import math
-import pygame
+import os
 import random
-import heapq
-import nltk
-from nltk.corpus import words
 import sys
+import time
+from assets import Assets, StartupProfile, load_sound
 
-nltk.download('words')
-valid_words = set(w.lower() for w in words.words())
-short_valid_words = {
-    "cat", "dog", "car", "sun", "run", "red", "man", "fun", "cup", "map", "top", "toy", "box", "fox", "log",
-    "yes", "hat", "bat", "rat", "mat", "pot", "pen", "can", "win", "bus", "net", "dot", "fan", "bed", "egg",
-    "four", "five", "cool", "look", "make", "game", "word", "play", "code", "read"
-}
+# Run with --profile-startup to get time-to-first-frame broken down by phase
+startup = StartupProfile(enabled="--profile-startup" in sys.argv)
 
-WIDTH, HEIGHT = 1550, 775
-GRID_SIZE = 20
-FPS = 7
+import pygame
+from ui import (draw_gradient_background, ParticlePool, BackgroundParticles, TextCache, build_tile_atlas,
+                DirtyRects, StaticLayer, CachedLayer, Camera, interpolate)
+from game_state import (GameState, step, WIDTH, HEIGHT, GRID_SIZE, PLAYER, PLAYER2, AI, FREE_FORM,
+                        short_valid_words, word_pool)
+# Prebuilt by `python dictionary.py`, memory-mapped on the first lookup
+from dictionary import valid_words, valid_prefixes
+from replay import ReplayLog
+from controls import DirectionQueue, queue_keys
+from profiler import frame_profiler
+startup.mark("imports")
+
+# Game logic runs at TICK_RATE ticks a second (--tick-rate N to change it),
+# the screen redraws at RENDER_FPS with snakes and eagles interpolated in between
+TICK_RATE = 7
+RENDER_FPS = 60
+# After a long stall at most this many ticks are caught up, the rest is dropped
+MAX_CATCH_UP = 5
 
 obstacle_color = {
     "water": (0, 120, 255),
@@ -34,23 +42,38 @@ obstacle_symbol = {
 
 pygame.init()
 pygame.mixer.init()
-try:
-    EMOJI_FONT = pygame.font.Font("seguiemj.ttf", 24)
-except:
-    EMOJI_FONT = pygame.font.SysFont("Arial", 24)
-BIG_FONT = pygame.font.SysFont("consolas", 48)
+startup.mark("pygame.init")
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("AI Word Snake")
+startup.mark("display")
 
-try:
-    EAT_SOUND = pygame.mixer.Sound("car_door.mp3")
-    WORD_SOUND = pygame.mixer.Sound("game.mp3")
-except:
-    EAT_SOUND = pygame.mixer.Sound(buffer=bytearray(44))
-    WORD_SOUND = pygame.mixer.Sound(buffer=bytearray(44))
-
+# Only the fonts the menu draws with are loaded up front
+BIG_FONT = pygame.font.SysFont("consolas", 48)
 FONT = pygame.font.SysFont("consolas", 36)
-INSTR_FONT = pygame.font.SysFont("Courier New", 24)
+startup.mark("menu fonts")
+
+def load_emoji_font():
+    try:
+        return pygame.font.Font("seguiemj.ttf", 24)
+    except:
+        return pygame.font.SysFont("Arial", 24)
+
+def load_dictionary():
+    # Touch the word list, trie and word tiers so the first game doesn't wait on them
+    len(valid_words)
+    len(valid_prefixes)
+    word_pool.load()
+    return True
+
+# Sounds (decoded once, then cached as raw PCM) and the dictionary load on a
+# background thread while the menu runs; the game's own fonts and tiles are
+# made in load_game_assets() when the first game starts
+assets = Assets(startup)
+assets.register("eat_sound", lambda: load_sound("car_door.mp3"))
+assets.register("word_sound", lambda: load_sound("game.mp3"))
+assets.register("dictionary", load_dictionary)
+assets.register("emoji_font", load_emoji_font)
+assets.preload(["eat_sound", "word_sound", "dictionary"])
 
 
 WHITE = (245, 245, 245)
@@ -64,56 +87,71 @@ BLACK = (0, 0, 0)
 PURPLE = (128, 0, 128)
 BACKGROUND_COLOR = (0, 0, 0)  # Black background
 
+# Everything draw_game writes is rendered once and reused: HUD strings through
+# the LRU text cache, letter and obstacle tiles from a pre-built atlas
+text_cache = TextCache()
+tiles = {ch: (RED, ch, WHITE, (2, 1)) for ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+tiles.update({t: (obstacle_color[t], obstacle_symbol[t], WHITE, (2, 2)) for t in obstacle_symbol})
+EMOJI_FONT = None
+tile_atlas = None
+TILE_OVERFLOW = 0
+static_layer = None
+
+def load_game_assets():
+    # Fonts and tiles only the game screen uses, built when the first game starts
+    global EMOJI_FONT, tile_atlas, TILE_OVERFLOW, static_layer
+    if tile_atlas is not None:
+        return
+    assets.wait()
+    EMOJI_FONT = assets.get("emoji_font")
+    tile_atlas = build_tile_atlas(EMOJI_FONT, GRID_SIZE, tiles)
+    TILE_OVERFLOW = max(max(t.get_width(), t.get_height()) for t in tile_atlas.values()) - GRID_SIZE
+    static_layer = StaticLayer((WIDTH, HEIGHT), tile_atlas, GRID_SIZE)
+
+# Optional dirty-rect mode (--dirty-rects): repaint only the cells and HUD that
+# changed since the last frame and push just those rects, see draw_game_dirty
+DIRTY_RENDERING = False
+HUD_RECT = pygame.Rect(0, 0, WIDTH, 100)
+dirty = DirtyRects()
+
+# HUD surfaces live for the whole session and are only redrawn when the word,
+# progress or a score changes; hud_panel.rebuilds / hud_text.rebuilds say how often
+hud_panel = CachedLayer((WIDTH, 80), (30, 30, 30, 180))
+hud_text = CachedLayer(HUD_RECT.size)
+word_bg = pygame.Surface((WIDTH, 40), pygame.SRCALPHA).convert_alpha()
+word_bg.fill((0, 0, 0, 150))
+
+# Frame profiler overlay, toggled with F3 (--profile starts with it shown); its
+# numbers are only re-rendered every PROFILE_REFRESH seconds so they stay readable
+PROFILE_RECT = pygame.Rect(10, HEIGHT - 180, 300, 170)
+PROFILE_REFRESH = 0.5
+profile_layer = CachedLayer(PROFILE_RECT.size, (0, 0, 0, 180))
+PROFILE_FONT = None
+
+# Boards bigger than the window (--board COLSxROWS) are seen through cameras
+# following player 1, split screen with player 2, see draw_game_viewports
+OUTSIDE_COLOR = (12, 12, 12)
+GRID_LINE_COLOR = (40, 40, 40)
+GRID_LINE_EVERY = 5 * GRID_SIZE
+cameras = {}
+
 
 # Add to initialization
-particles = []
-for _ in range(50):
-    particles.append({
-        'x': random.randint(0, WIDTH),
-        'y': random.randint(0, HEIGHT),
-        'size': random.randint(1, 3),
-        'speed': random.uniform(0.1, 0.5)
-    })
+PARTICLE_CAP = 256  # most burst particles alive at once
+particles = BackgroundParticles(50, WIDTH, HEIGHT)
+burst_particles = ParticlePool(PARTICLE_CAP)
 
 def choose_mode():
-    import math
-    screen_rect = screen.get_rect()
     msg = BIG_FONT.render("Choose Game Mode", True, WHITE)
-    opt_texts = ["AI vs Human", "AI vs Human vs Human"]
+    opt_texts = ["AI vs Human", "AI vs Human vs Human", "Free Words: AI vs Human"]
     selected = 0
     clock = pygame.time.Clock()
     t = 0  # time variable for animation
 
-    def draw_gradient_background(tick):
-        top_color = (40, 0, 80)    # deep indigo
-        mid_color = (128, 0, 128)  # vibrant purple
-        bottom_color = (30, 144, 255)  # soft sky blue
-
-        height = screen_rect.height
-        for y in range(height):
-            blend = y / height
-            wave = math.sin(tick + y * 0.01) * 0.1  # gentle animation
-            blend += wave
-            blend = max(0, min(blend, 1))  # clamp to [0,1]
-
-            if blend < 0.5:
-                ratio = blend * 2
-                r = int(top_color[0] * (1 - ratio) + mid_color[0] * ratio)
-                g = int(top_color[1] * (1 - ratio) + mid_color[1] * ratio)
-                b = int(top_color[2] * (1 - ratio) + mid_color[2] * ratio)
-            else:
-                ratio = (blend - 0.5) * 2
-                r = int(mid_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-                g = int(mid_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-                b = int(mid_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-
-            pygame.draw.line(screen, (r, g, b), (0, y), (screen_rect.width, y))
-
-
     while True:
         clock.tick(60)
         t += 0.05
-        draw_gradient_background(t)
+        draw_gradient_background(screen, t)
         screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, HEIGHT // 2 - 100))
 
         for i, text in enumerate(opt_texts):
@@ -139,6 +177,7 @@ def choose_mode():
             screen.blit(rendered, rect)
 
         pygame.display.flip()
+        startup.first_frame()
 
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
@@ -150,99 +189,34 @@ def choose_mode():
                 elif e.key == pygame.K_UP:
                     selected = (selected - 1) % len(opt_texts)
                 elif e.key == pygame.K_RETURN:
-                    return "vs_ai" if selected == 0 else "vs_ai_human2"
+                    return ["vs_ai", "vs_ai_human2", FREE_FORM][selected]
 
 
 def is_valid_word(word):
     return len(word) >= 3 and (word in valid_words or word in short_valid_words)
 
-def get_random_word():
-    return random.choice(list(short_valid_words))
-
-def heuristic(a, b):
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
-
-def astar(start, goal, snake_body, width, height, obstacles=[]):
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
-    obstacle_positions = {(o[0], o[1]) for o in obstacles}
-
-    while open_set:
-        _, current = heapq.heappop(open_set)
-        if current == goal:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            return path[::-1]
-        for dx, dy in [(0, -GRID_SIZE), (0, GRID_SIZE), (-GRID_SIZE, 0), (GRID_SIZE, 0)]:
-            neighbor = (current[0]+dx, current[1]+dy)
-            if (0 <= neighbor[0] < width and 0 <= neighbor[1] < height and 
-                neighbor not in snake_body and neighbor not in obstacle_positions):
-                tentative_g = g_score[current] + 1
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-    return []
-
-def safe_spawn(exclude):
-    while True:
-        x = random.randint(2, WIDTH//GRID_SIZE - 3) * GRID_SIZE
-        y = random.randint(2, HEIGHT//GRID_SIZE - 3) * GRID_SIZE
-        if (x, y) not in exclude:
-            return (x, y)
-
-def spawn_letters(word, snake, ai_snake, snake2=None):
-    letters = []
-    all_positions = snake + ai_snake
-    if snake2:
-        all_positions += snake2
-    for letter in word:
-        for _ in range(3):
-            while True:
-                x = random.randint(0, WIDTH//GRID_SIZE - 1) * GRID_SIZE
-                y = random.randint(0, HEIGHT//GRID_SIZE - 1) * GRID_SIZE
-                if (x, y) not in all_positions:
-                    letters.append((x, y, letter.upper()))
-                    all_positions.append((x, y))
-                    break
-    return letters
-
-def spawn_obstacles(num, exclude):
-    types = list(obstacle_symbol.keys())
-    obstacles = []
-    while len(obstacles) < num:
-        x = random.randint(0, WIDTH // GRID_SIZE - 1) * GRID_SIZE
-        y = random.randint(0, HEIGHT // GRID_SIZE - 1) * GRID_SIZE
-        if (x, y) not in exclude:
-            obstacle_type = random.choice(types)
-            obstacles.append((x, y, obstacle_type))
-            exclude.append((x, y))
-    return obstacles
+def segment_color(color, i):
+    # Gradient body - darker towards tail
+    shade = max(50, 255 - i*3)
+    return (min(color[0], shade), min(color[1], shade), min(color[2], shade))
+
+def draw_segment(segment, color, body_color, is_head, direction):
+    rect = pygame.Rect(segment[0], segment[1], GRID_SIZE, GRID_SIZE)
+    pygame.draw.rect(screen, body_color, rect, border_radius=5)
+
+    # Head with eyes looking in movement direction
+    if is_head:
+        pygame.draw.rect(screen, color, rect, border_radius=5)
+        eye_offset_x = 5 if direction[0] > 0 else -5 if direction[0] < 0 else 0
+        eye_offset_y = -5 if direction[1] == 0 else (5 if direction[1] > 0 else -5)
+        pygame.draw.circle(screen, WHITE, (rect.centerx + eye_offset_x, rect.centery + eye_offset_y), 4)
+        pygame.draw.circle(screen, BLACK, (rect.centerx + eye_offset_x, rect.centery + eye_offset_y), 2)
 
 def draw_snake(snake, color, direction):
     for i, segment in enumerate(snake):
-        rect = pygame.Rect(segment[0], segment[1], GRID_SIZE, GRID_SIZE)
-        
-        # Gradient body - darker towards tail
-        shade = max(50, 255 - i*3)
-        body_color = (min(color[0], shade), min(color[1], shade), min(color[2], shade))
-        pygame.draw.rect(screen, body_color, rect, border_radius=5)
-        
-        # Head with eyes looking in movement direction
-        if i == 0:
-            pygame.draw.rect(screen, color, rect, border_radius=5)
-            eye_offset_x = 5 if direction[0] > 0 else -5 if direction[0] < 0 else 0
-            eye_offset_y = -5 if direction[1] == 0 else (5 if direction[1] > 0 else -5)
-            pygame.draw.circle(screen, WHITE, (rect.centerx + eye_offset_x, rect.centery + eye_offset_y), 4)
-            pygame.draw.circle(screen, BLACK, (rect.centerx + eye_offset_x, rect.centery + eye_offset_y), 2)
-
-def draw_game(snake, ai_snake, letters, word, player_index, ai_index, p_score, ai_score, obstacles, mode, snake2=None, player2_index=0):
+        draw_segment(segment, color, segment_color(color, i), i == 0, direction)
+
+def draw_game(snake, ai_snakes, letters, word, player_index, ai_index, p_score, ai_score, obstacles, mode, snake2=None, player2_index=0, layout=None, prefixes=None):
     screen.fill(DARK)
     # for p in particles:
     #     pygame.draw.circle(screen, (80, 80, 80), (int(p['x']), int(p['y'])), p['size'])
@@ -250,31 +224,121 @@ def draw_game(snake, ai_snake, letters, word, player_index, ai_index, p_score, a
     #     if p['x'] < 0:
     #         p['x'] = WIDTH
     #         p['y'] = random.randint(0, HEIGHT)
-    for p in particles:
-        if 'speed' in p:
-            # Background floating particle
-            pygame.draw.circle(screen, (80, 80, 80), (int(p['x']), int(p['y'])), p['size'])
-            p['x'] -= p['speed']
-            if p['x'] < 0:
-                p['x'] = WIDTH
-                p['y'] = random.randint(0, HEIGHT)
-        else:
-            # Burst particles from letter collection
-            pygame.draw.circle(screen, p['color'], (int(p['x']), int(p['y'])), p['size'])
-            p['x'] += p['speed_x']
-            p['y'] += p['speed_y']
-            p['life'] -= 50
-        #can remove if we dont like it
-          
-    # Semi-transparent score panel
-    score_panel = pygame.Surface((WIDTH, 80), pygame.SRCALPHA)
-    score_panel.fill((30, 30, 30, 180))
-    screen.blit(score_panel, (0, 0))
+    # Background floating particles
+    particles.draw(screen)
+    particles.update()
+    # Burst particles from letter collection, dropped once their life runs out
+    burst_particles.draw(screen)
+    burst_particles.update()
+    #can remove if we dont like it
+
+    draw_hud_panel(word, player_index)
+
+    # Letters and water/fire/pits only change on respawn or when a letter is eaten
+    static_layer.update(layout, letters, obstacles)
+    static_layer.draw(screen)
+
+    draw_snake(snake, GREEN, direction=(GRID_SIZE, 0))
+    for ai_snake in ai_snakes:
+        draw_snake(ai_snake, BLUE, direction=(GRID_SIZE, 0))
+    if mode == "vs_ai_human2" and snake2:
+        draw_snake(snake2, YELLOW, direction=(GRID_SIZE, 0))
     
+   #screen.blit(EMOJI_FONT.render("Target Word: " + word.upper(), True, YELLOW), (WIDTH//2 - 100, 10))
+
+    draw_hud_text(word, player_index, ai_index, p_score, ai_score, mode, player2_index, prefixes)
+
+    for x, y, t in obstacles:
+        if t == "eagle":
+            screen.blit(tile_atlas[t], (x, y))
+
+    if frame_profiler.overlay:
+        draw_profile_overlay()
+    with frame_profiler.span("flip"):
+        pygame.display.flip()
+
+def draw_game_viewports(snake, ai_snakes, letters, word, player_index, ai_index, p_score, ai_score, obstacles, mode, snake2=None, player2_index=0, layout=None, prefixes=None, world=(WIDTH, HEIGHT)):
+    """draw_game for boards bigger than the window.
+
+    Each view is a Camera centred on its player's head (player 2 gets the
+    right half of the screen in vs_ai_human2), and only letters, obstacles
+    and segments inside a view are drawn, so a frame costs the same on any
+    board size. The HUD goes on top; there are no background specks here.
+    """
+    split = mode == "vs_ai_human2" and bool(snake2)
+    key = (world, split)
+    if key not in cameras:
+        if split:
+            cameras[key] = (Camera((0, 0, WIDTH // 2 - 1, HEIGHT), world),
+                            Camera((WIDTH // 2 + 1, 0, WIDTH - WIDTH // 2 - 1, HEIGHT), world))
+        else:
+            cameras[key] = (Camera(screen.get_rect(), world),)
+    screen.fill(BLACK)
+    snakes = [(snake, GREEN)] + [(ai_snake, BLUE) for ai_snake in ai_snakes] + [(snake2, YELLOW)]
+    for camera, followed in zip(cameras[key], (snake, snake2)):
+        # A Snake or, between ticks, a list of interpolated positions
+        head = next(iter(followed))
+        camera.follow((head[0] + GRID_SIZE // 2, head[1] + GRID_SIZE // 2))
+        screen.set_clip(camera.view)
+        draw_view(camera, snakes, letters, obstacles)
+    screen.set_clip(None)
+    burst_particles.update()
+
+    draw_hud_panel(word, player_index)
+    draw_hud_text(word, player_index, ai_index, p_score, ai_score, mode, player2_index, prefixes)
+    if frame_profiler.overlay:
+        draw_profile_overlay()
+    with frame_profiler.span("flip"):
+        pygame.display.flip()
+
+def draw_view(camera, snakes, letters, obstacles):
+    dx, dy = camera.offset
+    # Past the edge of the board is darker than the board itself
+    screen.fill(OUTSIDE_COLOR, camera.view)
+    screen.fill(DARK, pygame.Rect(dx, dy, camera.world_width, camera.world_height).clip(camera.view))
+    # Faint grid lines so movement shows even where the board is empty
+    c0, r0, c1, r1 = camera.cells(GRID_LINE_EVERY)
+    top, bottom = max(dy, camera.view.top), min(dy + camera.world_height, camera.view.bottom)
+    left, right = max(dx, camera.view.left), min(dx + camera.world_width, camera.view.right)
+    for c in range(c0, c1):
+        pygame.draw.line(screen, GRID_LINE_COLOR, (c * GRID_LINE_EVERY + dx, top), (c * GRID_LINE_EVERY + dx, bottom))
+    for r in range(r0, r1):
+        pygame.draw.line(screen, GRID_LINE_COLOR, (left, r * GRID_LINE_EVERY + dy), (right, r * GRID_LINE_EVERY + dy))
+    burst_particles.draw(screen, (dx, dy))
+
+    margin = GRID_SIZE + TILE_OVERFLOW
+    for x, y, ch in letters:
+        if camera.visible((x, y), margin):
+            screen.blit(tile_atlas[ch], (x + dx, y + dy))
+    for x, y, t in obstacles:
+        if t != "eagle" and camera.visible((x, y), margin):
+            screen.blit(tile_atlas[t], (x + dx, y + dy))
+    for body, color in snakes:
+        if not body:
+            continue
+        for i, (x, y) in enumerate(body):
+            if camera.visible((x, y), GRID_SIZE):
+                draw_segment((x + dx, y + dy), color, segment_color(color, i), i == 0, (GRID_SIZE, 0))
+    for x, y, t in obstacles:
+        if t == "eagle" and camera.visible((x, y), margin):
+            screen.blit(tile_atlas[t], (x + dx, y + dy))
+
+def draw_hud_panel(word, player_index):
+    # Semi-transparent score panel, only re-composited when the word or progress changes
+    hud_panel.update((word, player_index), compose_hud_panel, word, player_index)
+    hud_panel.draw(screen)
+
+    # Word display with background, cut from the preallocated strip
+    word_text = text_cache.render(FONT, word.upper(), YELLOW)
+    bg_width = word_text.get_width() + 20
+    screen.blit(word_bg, (WIDTH//2 - bg_width//2, 10), (0, 0, bg_width, 40))
+    screen.blit(word_text, (WIDTH//2 - word_text.get_width()//2, 15))
+
+def compose_hud_panel(panel, word, player_index):
     # Progress bar for word completion
-    pygame.draw.rect(screen, (60, 60, 60), (WIDTH//2 - 150, 50, 300, 10), border_radius=5)
-    progress = player_index/len(word) * 300
-    pygame.draw.rect(screen, GREEN, (WIDTH//2 - 150, 50, progress, 10), border_radius=5)
+    pygame.draw.rect(panel, (60, 60, 60), (WIDTH//2 - 150, 50, 300, 10), border_radius=5)
+    progress = min(player_index/len(word), 1) * 300
+    pygame.draw.rect(panel, GREEN, (WIDTH//2 - 150, 50, progress, 10), border_radius=5)
     
     # Score with icons
     #screen.blit(EMOJI_FONT.render( True, WHITE), (20, 15))
@@ -282,70 +346,144 @@ def draw_game(snake, ai_snake, letters, word, player_index, ai_index, p_score, a
     
    # screen.blit(EMOJI_FONT.render( True, WHITE), (120, 15))
     #screen.blit(FONT.render(f"{ai_score}", True, BLUE), (150, 15))
-    
-    # Word display with background
-    word_bg = pygame.Surface((FONT.size(word.upper())[0] + 20, 40), pygame.SRCALPHA)
-    word_bg.fill((0, 0, 0, 150))
-    screen.blit(word_bg, (WIDTH//2 - word_bg.get_width()//2, 10))
-    screen.blit(FONT.render(word.upper(), True, YELLOW), (WIDTH//2 - FONT.size(word.upper())[0]//2, 15))
-
 
-    draw_snake(snake, GREEN, direction=(GRID_SIZE, 0))
-    draw_snake(ai_snake, BLUE, direction=(GRID_SIZE, 0))
-    if mode == "vs_ai_human2" and snake2:
-        draw_snake(snake2, YELLOW, direction=(GRID_SIZE, 0))
-
-    for x, y, ch in letters:
-        pygame.draw.rect(screen, RED, pygame.Rect(x, y, GRID_SIZE, GRID_SIZE), border_radius=3)
-        screen.blit(EMOJI_FONT.render(ch, True, WHITE), (x + 2, y + 1))
-    
-   #screen.blit(EMOJI_FONT.render("Target Word: " + word.upper(), True, YELLOW), (WIDTH//2 - 100, 10))
-    
-    if mode == "vs_ai_human2":
-        screen.blit(EMOJI_FONT.render(f"Player 1: {player_index}/{len(word)}", True, GREEN), (20, 10))
-        screen.blit(EMOJI_FONT.render(f"Player 2: {player2_index}/{len(word)}", True, YELLOW), (20, 40))
-        screen.blit(EMOJI_FONT.render(f"AI: {ai_index}/{len(word)}", True, BLUE), (20, 70))
+def draw_hud_text(word, player_index, ai_index, p_score, ai_score, mode, player2_index, prefixes=None):
+    hud = (word, player_index, ai_index, p_score, ai_score, mode, player2_index, prefixes)
+    hud_text.update(hud, compose_hud_text, *hud)
+    hud_text.draw(screen)
+
+def compose_hud_text(layer, word, player_index, ai_index, p_score, ai_score, mode, player2_index, prefixes):
+    if mode == FREE_FORM:
+        # What each snake has spelled so far
+        layer.blit(text_cache.render(EMOJI_FONT, f"Player: {prefixes[0] or '-'}", GREEN), (20, 10))
+        layer.blit(text_cache.render(EMOJI_FONT, f"AI: {prefixes[1] or '-'}", BLUE), (20, 40))
+    elif mode == "vs_ai_human2":
+        layer.blit(text_cache.render(EMOJI_FONT, f"Player 1: {player_index}/{len(word)}", GREEN), (20, 10))
+        layer.blit(text_cache.render(EMOJI_FONT, f"Player 2: {player2_index}/{len(word)}", YELLOW), (20, 40))
+        layer.blit(text_cache.render(EMOJI_FONT, f"AI: {ai_index}/{len(word)}", BLUE), (20, 70))
     else:
-        screen.blit(EMOJI_FONT.render(f"Player: {player_index}/{len(word)}", True, GREEN), (20, 10))
-        screen.blit(EMOJI_FONT.render(f"AI: {ai_index}/{len(word)}", True, BLUE), (20, 40))
-    
-    screen.blit(EMOJI_FONT.render(f"Player Score: {p_score}", True, GREEN), (950, 10))
-    screen.blit(EMOJI_FONT.render(f"AI Score: {ai_score}", True, BLUE), (950, 40))
+        layer.blit(text_cache.render(EMOJI_FONT, f"Player: {player_index}/{len(word)}", GREEN), (20, 10))
+        layer.blit(text_cache.render(EMOJI_FONT, f"AI: {ai_index}/{len(word)}", BLUE), (20, 40))
     
+    layer.blit(text_cache.render(EMOJI_FONT, f"Player Score: {p_score}", GREEN), (950, 10))
+    layer.blit(text_cache.render(EMOJI_FONT, f"AI Score: {ai_score}", BLUE), (950, 40))
+
+def draw_profile_overlay():
+    profile_layer.update(int(time.perf_counter() / PROFILE_REFRESH), compose_profile_overlay)
+    profile_layer.draw(screen, PROFILE_RECT.topleft)
+
+def compose_profile_overlay(layer):
+    global PROFILE_FONT
+    if PROFILE_FONT is None:
+        PROFILE_FONT = pygame.font.SysFont("consolas", 16)
+    rows = [("ms", "p50", "p95", "p99")]
+    for name, percentiles in frame_profiler.stats().items():
+        rows.append((name, *(f"{ms:.2f}" for ms in percentiles)))
+    for i, row in enumerate(rows):
+        layer.blit(PROFILE_FONT.render(row[0], True, WHITE), (10, 8 + i * 18))
+        # Numbers right-aligned in their column, whatever font we ended up with
+        for k, cell in enumerate(row[1:]):
+            text = PROFILE_FONT.render(cell, True, WHITE)
+            layer.blit(text, (150 + 70 * k - text.get_width(), 8 + i * 18))
+
+def scene_cells(snake, ai_snakes, letters, obstacles, snake2=None):
+    # What ends up drawn in every occupied cell this frame, in drawing order
+    cells = {}
+    for body, color in [(snake, GREEN)] + [(ai_snake, BLUE) for ai_snake in ai_snakes] + [(snake2, YELLOW)]:
+        if not body:
+            continue
+        for i, segment in enumerate(body):
+            cells[segment] = cells.get(segment, ()) + (("snake", color, segment_color(color, i), i == 0),)
+    for x, y, ch in letters:
+        cells[(x, y)] = cells.get((x, y), ()) + (("tile", ch),)
     for x, y, t in obstacles:
-        pygame.draw.rect(screen, obstacle_color[t], pygame.Rect(x, y, GRID_SIZE, GRID_SIZE), border_radius=3)
-        screen.blit(EMOJI_FONT.render(obstacle_symbol[t], True, WHITE), (x + 2, y + 2))
-    
-    pygame.display.flip()
+        cells[(x, y)] = cells.get((x, y), ()) + (("tile" if t != "eagle" else "eagle", t),)
+    return cells
 
-def show_scorecard(player_score, ai_score, player2_score=None):
-    def draw_gradient_background(tick):
-        top_color = (40, 0, 80)    # deep indigo
-        mid_color = (128, 0, 128)  # vibrant purple
-        bottom_color = (30, 144, 255)  # soft sky blue
-
-        height = screen.get_height()
-        for y in range(height):
-            blend = y / height
-            wave = math.sin(tick + y * 0.01) * 0.05  # more subtle animation
-            blend += wave
-            blend = max(0, min(blend, 1))  # clamp to [0,1]
-
-            if blend < 0.5:
-                ratio = blend * 2
-                r = int(top_color[0] * (1 - ratio) + mid_color[0] * ratio)
-                g = int(top_color[1] * (1 - ratio) + mid_color[1] * ratio)
-                b = int(top_color[2] * (1 - ratio) + mid_color[2] * ratio)
-            else:
-                ratio = (blend - 0.5) * 2
-                r = int(mid_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-                g = int(mid_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-                b = int(mid_color[2] * (1 - ratio) + bottom_color[2] * ratio)
+def cell_rect(pos):
+    # Tiles can spill a few pixels right/down of their cell, so cover that too
+    return pygame.Rect(pos[0], pos[1], GRID_SIZE + TILE_OVERFLOW, GRID_SIZE + TILE_OVERFLOW)
+
+def repaint(rect, cells, hud):
+    screen.set_clip(rect)
+    screen.fill(DARK)
+    burst_particles.draw(screen)
+    on_hud = rect.colliderect(HUD_RECT)
+    if on_hud:
+        draw_hud_panel(hud[0], hud[1])
+    static_layer.draw(screen, rect)
+
+    # Anything from a cell up to TILE_OVERFLOW above/left of rect may reach into it
+    snakes, eagles = [], []
+    for cx in range(max(0, (rect.left - TILE_OVERFLOW) // GRID_SIZE), (rect.right - 1) // GRID_SIZE + 1):
+        for cy in range(max(0, (rect.top - TILE_OVERFLOW) // GRID_SIZE), (rect.bottom - 1) // GRID_SIZE + 1):
+            pos = (cx * GRID_SIZE, cy * GRID_SIZE)
+            for item in cells.get(pos, ()):
+                if item[0] == "snake":
+                    snakes.append((pos, item))
+                elif item[0] == "eagle":
+                    eagles.append(pos)
+    for pos, (_, color, body_color, is_head) in snakes:
+        draw_segment(pos, color, body_color, is_head, (GRID_SIZE, 0))
+    if on_hud:
+        draw_hud_text(*hud)
+    for pos in eagles:
+        screen.blit(tile_atlas["eagle"], pos)
+    if frame_profiler.overlay and rect.colliderect(PROFILE_RECT):
+        draw_profile_overlay()
+    screen.set_clip(None)
+
+def draw_game_dirty(snake, ai_snakes, letters, word, player_index, ai_index, p_score, ai_score, obstacles, mode, snake2=None, player2_index=0, layout=None, prefixes=None):
+    """Same picture as draw_game, but only repaints what changed since the last frame.
+
+    Cells whose snakes/letters/obstacles changed, the HUD when a score or the
+    word changes, and burst particles are repainted and pushed with
+    display.update(rects). The drifting background specks are left out in
+    this mode since they would dirty the whole screen every frame.
+    """
+    static_layer.update(layout, letters, obstacles)
+    cells = scene_cells(snake, ai_snakes, letters, obstacles, snake2)
+    hud = (word, player_index, ai_index, p_score, ai_score, mode, player2_index, prefixes)
+    overlay = int(time.perf_counter() / PROFILE_REFRESH) if frame_profiler.overlay else None
+    if dirty.full:
+        dirty.full = False
+        dirty.sync(cells, cell_rect)
+        dirty.take()
+        dirty.hud = hud
+        dirty.particles = burst_particles.rects()
+        dirty.overlay = overlay
+        repaint(screen.get_rect(), cells, hud)
+        burst_particles.update()
+        with frame_profiler.span("flip"):
+            pygame.display.flip()
+        return
+
+    dirty.sync(cells, cell_rect)
+    if hud != dirty.hud:
+        dirty.mark(HUD_RECT)
+        dirty.hud = hud
+    # Erase where bursts were drawn last frame, draw where they are now
+    particle_rects = burst_particles.rects()
+    for rect in dirty.particles + particle_rects:
+        dirty.mark(rect)
+    dirty.particles = particle_rects
+    if overlay != dirty.overlay:
+        dirty.mark(PROFILE_RECT)
+        dirty.overlay = overlay
+
+    rects = dirty.take()
+    for rect in rects:
+        repaint(rect, cells, hud)
+    burst_particles.update()
+    with frame_profiler.span("flip"):
+        pygame.display.update(rects)
 
-            pygame.draw.line(screen, (r, g, b), (0, y), (screen.get_width(), y))
+def show_scorecard(player_score, ai_score, player2_score=None):
+    clock = pygame.time.Clock()
     tick = 0
     while True:
-        draw_gradient_background(tick)
+        clock.tick(60)
+        draw_gradient_background(screen, tick, wave=0.05)
         tick += 0.05
 
         game_over_text = BIG_FONT.render("Game Over", True, RED)
@@ -393,6 +531,7 @@ def show_instructions(mode):
         "  - Form valid English words by collecting letters in order.",
         "  - Navigate safely using movement keys.",
         "  - Compete with AI (and another player, if enabled).",
+        "  - Free Words: spell any English word, one letter at a time.",
         "",
         "🔣 CONTROLS:",
         "  - Player 1: [↑ ↓ ← →] Arrow Keys",
@@ -434,33 +573,13 @@ def show_instructions(mode):
         rendered_line = INSTR_FONT.render(line, True, (255, 255, 255))
         instr_surface.blit(rendered_line, (0, i * line_height))
 
+    clock = pygame.time.Clock()
     while waiting:
+        clock.tick(60)
         tick = pygame.time.get_ticks() / 500
 
         # Gradient background (same as before)
-        top_color = (40, 0, 80)
-        mid_color = (128, 0, 128)
-        bottom_color = (30, 144, 255)
-        height = screen.get_height()
-
-        for y in range(height):
-            blend = y / height
-            wave = math.sin(tick + y * 0.01) * 0.1
-            blend += wave
-            blend = max(0, min(blend, 1))
-
-            if blend < 0.5:
-                ratio = blend * 2
-                r = int(top_color[0] * (1 - ratio) + mid_color[0] * ratio)
-                g = int(top_color[1] * (1 - ratio) + mid_color[1] * ratio)
-                b = int(top_color[2] * (1 - ratio) + mid_color[2] * ratio)
-            else:
-                ratio = (blend - 0.5) * 2
-                r = int(mid_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-                g = int(mid_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-                b = int(mid_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-
-            pygame.draw.line(screen, (r, g, b), (0, y), (WIDTH, y))
+        draw_gradient_background(screen, tick)
 
         # Draw scrollable instructions
         visible_height = HEIGHT - 100  # Leave some margin at top and bottom
@@ -502,44 +621,112 @@ def show_instructions(mode):
         if keys[pygame.K_UP]:
             scroll_offset = max(scroll_offset - scroll_speed, 0)
 
+PLAYER1_KEYS = [(pygame.K_UP, (0, -GRID_SIZE)), (pygame.K_DOWN, (0, GRID_SIZE)),
+                (pygame.K_LEFT, (-GRID_SIZE, 0)), (pygame.K_RIGHT, (GRID_SIZE, 0))]
+PLAYER2_KEYS = [(pygame.K_w, (0, -GRID_SIZE)), (pygame.K_s, (0, GRID_SIZE)),
+                (pygame.K_a, (-GRID_SIZE, 0)), (pygame.K_d, (GRID_SIZE, 0))]
+
+def play_events(events, rng=random):
+    for kind, who, pos in events:
+        if kind == "eat":
+            pygame.mixer.Sound.play(assets.get("eat_sound"))
+            if who in (PLAYER, PLAYER2):
+                # Create particle effect, life is in steps of the old 7 FPS loop (ui.PARTICLE_STEP)
+                burst_particles.emit(pos[0] + GRID_SIZE//2, pos[1] + GRID_SIZE//2, 10,
+                                     50 if who == PLAYER2 else 30, rng)
+        elif kind == "word":
+            pygame.mixer.Sound.play(assets.get("word_sound"))
+
+def positions(state):
+    # What draw_state interpolates from: every snake segment and eagle before a tick
+    return (list(state.snake), [list(ai_snake) for ai_snake in state.ai_snakes],
+            list(state.snake2) if state.snake2 else None, list(state.eagles), state.layout)
+
+def draw_state(state, previous=None, alpha=1.0):
+    """Draw state, alpha (0..1) of the way from the previous positions to the current ones.
+
+    The dirty-rect renderer tracks whole cells, so it always draws tick positions.
+    """
+    load_game_assets()
+    # A board bigger than the window is drawn through cameras, which move every frame anyway
+    big = state.board.width > WIDTH or state.board.height > HEIGHT
+    dirty_rects = DIRTY_RENDERING and not big
+    snake, ai_snakes, snake2, obstacles = state.snake, state.ai_snakes, state.snake2, state.obstacles
+    if previous and alpha < 1 and not dirty_rects:
+        snake = interpolate(previous[0], snake, alpha)
+        # A lost AI snake shifts the others along, then they just snap for a frame
+        if len(previous[1]) == len(ai_snakes):
+            ai_snakes = [interpolate(before, now, alpha) for before, now in zip(previous[1], ai_snakes)]
+        if snake2:
+            snake2 = interpolate(previous[2], snake2, alpha)
+        # Freshly spawned eagles appear where they are instead of sliding in
+        if previous[4] == state.layout and state.eagles:
+            eagles = iter(interpolate(previous[3], state.eagles, alpha))
+            obstacles = [(*next(eagles), t) if t == "eagle" else (x, y, t) for x, y, t in obstacles]
+    word, prefixes = state.word, None
+    if state.free_form:
+        # The HUD shows the word being spelled instead of a target
+        prefixes = (state.prefix[PLAYER].upper(), state.prefix[AI].upper())
+        word = prefixes[0] + "_"
+    args = (snake, ai_snakes, state.letters, word, state.player_index, state.ai_index,
+            state.player_score, state.ai_score, obstacles, state.mode, snake2, state.player2_index, state.layout,
+            prefixes)
+    if big:
+        draw_game_viewports(*args, world=(state.board.width, state.board.height))
+    elif dirty_rects:
+        draw_game_dirty(*args)
+    else:
+        draw_game(*args)
+
+def command_line_option(name, default=None):
+    # Value after name on the command line, e.g. --seed 42
+    if name in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def save_replay(replay, state):
+    # With --record DIR every game's inputs are kept for `python replay.py`
+    record_dir = command_line_option("--record")
+    if record_dir:
+        os.makedirs(record_dir, exist_ok=True)
+        replay.finish(state)
+        replay.save(os.path.join(record_dir, f"replay-{state.seed}.wsr"))
+
+def report_input_latency(inputs):
+    # With --input-latency, how long each player's turns waited for their tick
+    if "--input-latency" in sys.argv:
+        for who, queue in inputs.items():
+            print(queue.latency_report("Player 1" if who == PLAYER else "Player 2"))
+
 def main():
+    global DIRTY_RENDERING
+    seed = command_line_option("--seed")
+    # --board COLSxROWS plays on a board of that many cells instead of one the size of the window
+    board = command_line_option("--board")
+    board_size = tuple(int(n) for n in board.lower().split("x")) if board else None
+    # --ai N puts a team of N AI snakes on the board, planned together
+    ai_count = int(command_line_option("--ai", 1))
+    # --profile shows the frame profiler from the start, --profile-csv FILE logs every frame's timings
+    if "--profile" in sys.argv:
+        frame_profiler.set_overlay(True)
+    if command_line_option("--profile-csv"):
+        frame_profiler.write_csv(command_line_option("--profile-csv"))
+    # --dirty-rects repaints only what changed each frame instead of the whole window
+    if "--dirty-rects" in sys.argv:
+        DIRTY_RENDERING = True
     while True:
         mode = choose_mode()
         show_instructions(mode)
-        snake = [safe_spawn([])]
-        ai_snake = [safe_spawn(snake)]
-        snake2 = None
-        direction2 = None
-        player2_index = 0
-        player2_score = 0
-
-        if mode == "vs_ai_human2":
-            snake2 = [safe_spawn(snake + ai_snake)]
-            direction2 = (-GRID_SIZE, 0)
-
-        obstacles = []
-        direction = (GRID_SIZE, 0)
+        load_game_assets()
+        state = GameState(mode, seed=None if seed is None else int(seed), board_size=board_size, ai_count=ai_count)
+        replay = ReplayLog.for_game(state)
+        # Particles get their own generator so they never shift the game's own draws
+        effects_rng = random.Random(state.seed)
+        tick_rate = float(command_line_option("--tick-rate", TICK_RATE))
         clock = pygame.time.Clock()
-        player_index = 0
-        ai_index = 0
-        player_score = 0
-        ai_score = 0
-        ai_freeze_timer = 0
         slow_timer = 0
         ai_slow_timer = 0
-        eagle_pos = None
-        eagle_tick = 0
 
-        word = get_random_word()
-        letters = spawn_letters(word, snake, ai_snake, snake2)
-        occupied = snake + ai_snake + [(l[0], l[1]) for l in letters]
-        if snake2:
-            occupied += snake2
-        obstacles = spawn_obstacles(5 + player_score // 5, occupied)
-        eagle_list = [o for o in obstacles if o[2] == 'eagle']
-        if eagle_list:
-            eagle_pos = [eagle_list[0][0], eagle_list[0][1]]
-        
         while True:
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
@@ -548,7 +735,8 @@ def main():
                     # Countdown before starting
                     for count in range(5, 0, -1):
                         screen.fill(BACKGROUND_COLOR)
-                        draw_game(snake, ai_snake, letters, word, player_index, ai_index, player_score, ai_score, obstacles, mode, snake2, player2_index)
+                        dirty.reset()
+                        draw_state(state)
                         text = FONT.render(str(count), True, (255, 255, 255))
                         rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
                         screen.blit(text, rect)
@@ -557,235 +745,81 @@ def main():
 
                     # Optional 'GO!' flash
                     screen.fill(BACKGROUND_COLOR)
-                    draw_game(snake, ai_snake, letters, word, player_index, ai_index, player_score, ai_score, obstacles, mode, snake2, player2_index)
+                    dirty.reset()
+                    draw_state(state)
                     go_text = FONT.render("GO!", True, (0, 255, 0))
                     go_rect = go_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
                     screen.blit(go_text, go_rect)
                     pygame.display.flip()
                     pygame.time.delay(500)
+                    # The countdown text was drawn over the board, start clean
+                    dirty.reset()
                     break
             else:
                 continue
             break
 
 
-        running = True
-        while running:
-            for e in pygame.event.get():
-                if e.type == pygame.QUIT:
-                    return
-
-            keys = pygame.key.get_pressed()
-            
-            # Player 1 controls
-            if keys[pygame.K_UP] and direction != (0, GRID_SIZE):
-                direction = (0, -GRID_SIZE)
-            elif keys[pygame.K_DOWN] and direction != (0, -GRID_SIZE):
-                direction = (0, GRID_SIZE)
-            elif keys[pygame.K_LEFT] and direction != (GRID_SIZE, 0):
-                direction = (-GRID_SIZE, 0)
-            elif keys[pygame.K_RIGHT] and direction != (-GRID_SIZE, 0):
-                direction = (GRID_SIZE, 0)
-
-            # Player 1 movement
-            new_head = (snake[0][0] + direction[0], snake[0][1] + direction[1])
-            if (new_head in snake[1:] or new_head in ai_snake or
-                new_head[0] < 0 or new_head[0] >= WIDTH or
-                new_head[1] < 0 or new_head[1] >= HEIGHT or
-                any(new_head == (o[0], o[1]) for o in obstacles)):  # Obstacle collision
-                running = False
-                break
-
-            if mode == "vs_ai_human2" and new_head in snake2:
-                running = False
-                break
-
-            snake.insert(0, new_head)
-            letter_collected = False
-            for l in letters[:]:
-                if (l[0], l[1]) == new_head and l[2] == word[player_index].upper():
-                    pygame.mixer.Sound.play(EAT_SOUND)
-                    player_index += 1
-                    player_score += 1
-                    letters.remove(l)
-                    letter_collected = True
-                    # Add to letter collection logic
-                    if letter_collected:
-                        # Create particle effect
-                        for _ in range(10):
-                            particles.append({
-                                'x': new_head[0] + GRID_SIZE//2,
-                                'y': new_head[1] + GRID_SIZE//2,
-                                'size': random.randint(2, 4),
-                                'speed_x': random.uniform(-2, 2),
-                                'speed_y': random.uniform(-2, 2),
-                                'color': (random.randint(200, 255), random.randint(100, 200), random.randint(50, 150)),
-                                'life': 30
-                            })
-                    break
-
-            if not letter_collected:
-                snake.pop()
-
-            if player_index == len(word):
-                pygame.mixer.Sound.play(WORD_SOUND)
-                player_score += 3
-                ai_freeze_timer = 50
-                word = get_random_word()
-                player_index = 0
-                ai_index = 0
-                letters = spawn_letters(word, snake, ai_snake, snake2)
-                occupied = snake + ai_snake + [(l[0], l[1]) for l in letters]
-                if snake2:
-                    occupied += snake2
-                obstacles = spawn_obstacles(5 + max(player_score, player2_score if mode == "vs_ai_human2" else player_score) // 5, occupied)
-                eagle_list = [o for o in obstacles if o[2] == 'eagle']
-                if eagle_list:
-                    eagle_pos = [eagle_list[0][0], eagle_list[0][1]]
-
-            # Player 2 controls and movement (if in vs_ai_human2 mode)
-            if mode == "vs_ai_human2":
-                if keys[pygame.K_w] and direction2 != (0, GRID_SIZE):
-                    direction2 = (0, -GRID_SIZE)
-                elif keys[pygame.K_s] and direction2 != (0, -GRID_SIZE):
-                    direction2 = (0, GRID_SIZE)
-                elif keys[pygame.K_a] and direction2 != (GRID_SIZE, 0):
-                    direction2 = (-GRID_SIZE, 0)
-                elif keys[pygame.K_d] and direction2 != (-GRID_SIZE, 0):
-                    direction2 = (GRID_SIZE, 0)
-
-                new_head2 = (snake2[0][0] + direction2[0], snake2[0][1] + direction2[1])
-                if (new_head2 in snake2[1:] or new_head2 in snake or new_head2 in ai_snake or
-                    new_head2[0] < 0 or new_head2[0] >= WIDTH or
-                    new_head2[1] < 0 or new_head2[1] >= HEIGHT or
-                    any(new_head2 == (o[0], o[1]) for o in obstacles)):  # Obstacle collision
-                    running = False
-                    break
-
-                snake2.insert(0, new_head2)
-                letter_collected2 = False
-                for l in letters[:]:
-                    if (l[0], l[1]) == new_head2 and l[2] == word[player2_index].upper():
-                        pygame.mixer.Sound.play(EAT_SOUND)
-                        player2_index += 1
-                        player2_score += 1
-                        letters.remove(l)
-                        letter_collected2 = True
-                        # Add to letter collection logic
-                        if letter_collected2:
-                            # Create particle effect
-                            for _ in range(10):
-                                particles.append({
-                                    'x': new_head[0] + GRID_SIZE//2,
-                                    'y': new_head[1] + GRID_SIZE//2,
-                                    'size': random.randint(2, 4),
-                                    'speed_x': random.uniform(-2, 2),
-                                    'speed_y': random.uniform(-2, 2),
-                                    'color': (random.randint(200, 255), random.randint(100, 200), random.randint(50, 150)),
-                                    'life': 50
-                                })
-                        break
-                if not letter_collected2:
-                    snake2.pop()
-
-                if player2_index == len(word):
-                    pygame.mixer.Sound.play(WORD_SOUND)
-                    player2_score += 3
-                    ai_freeze_timer = 30
-                    word = get_random_word()
-                    player_index = 0
-                    player2_index = 0
-                    ai_index = 0
-                    letters = spawn_letters(word, snake, ai_snake, snake2)
-                    occupied = snake + ai_snake + snake2 + [(l[0], l[1]) for l in letters]
-                    obstacles = spawn_obstacles(5 + max(player_score, player2_score) // 5, occupied)
-                    eagle_list = [o for o in obstacles if o[2] == 'eagle']
-                    if eagle_list:
-                        eagle_pos = [eagle_list[0][0], eagle_list[0][1]]
-
-            # AI Movement
-            if ai_freeze_timer <= 0:
-                if letters and ai_index < len(word):
-                    targets = [(x, y) for x, y, c in letters if c == word[ai_index].upper()]
-                    if targets:
-                        closest = min(targets, key=lambda pos: heuristic(ai_snake[0], pos))
-                        path = astar(ai_snake[0], closest, ai_snake + snake + (snake2 if snake2 else []), WIDTH, HEIGHT, obstacles)
-                        if path:
-                            next_pos = path[0]
-                            ai_snake.insert(0, next_pos)
-                            if next_pos == closest:
-                                pygame.mixer.Sound.play(EAT_SOUND)
-                                ai_index += 1
-                                ai_score += 1
-                                for l in letters[:]:
-                                    if (l[0], l[1]) == next_pos and l[2] == word[ai_index - 1].upper():
-                                        letters.remove(l)
-                                        break
-                            else:
-                                ai_snake.pop()
-                    else:
-                        ai_snake.pop()
-            else:
-                ai_freeze_timer -= 1
-
-            if (ai_snake[0] in ai_snake[1:] or ai_snake[0] in snake or
-                ai_snake[0][0] < 0 or ai_snake[0][0] >= WIDTH or
-                ai_snake[0][1] < 0 or ai_snake[0][1] >= HEIGHT or
-                any(ai_snake[0] == (o[0], o[1]) for o in obstacles)):  # Obstacle collision
-                running = False
-                break
-
-            if mode == "vs_ai_human2" and ai_snake[0] in snake2:
-                running = False
+        previous = positions(state)
+        accumulator = 0.0
+        # Keys pressed during the countdown don't count
+        pygame.event.clear(pygame.KEYDOWN)
+        inputs = {PLAYER: DirectionQueue()}
+        if mode == "vs_ai_human2":
+            inputs[PLAYER2] = DirectionQueue()
+        clock.tick()
+        frame_profiler.reset()
+        while state.running:
+            with frame_profiler.span("input"):
+                for e in pygame.event.get():
+                    if e.type == pygame.QUIT:
+                        save_replay(replay, state)
+                        report_input_latency(inputs)
+                        return
+                    if e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                        frame_profiler.set_overlay(not frame_profiler.overlay)
+                    elif e.type == pygame.KEYDOWN:
+                        # Queued as they come, so taps between two ticks aren't lost
+                        if not queue_keys(e, PLAYER1_KEYS, inputs[PLAYER], state.direction) and PLAYER2 in inputs:
+                            queue_keys(e, PLAYER2_KEYS, inputs[PLAYER2], state.direction2)
+
+            # Fixed timestep: run however many ticks the elapsed time is worth
+            accumulator = min(accumulator + clock.tick(RENDER_FPS) / 1000, MAX_CATCH_UP / tick_rate)
+            # Slowdown stretches the tick instead of blocking the loop
+            tick_length = 1 / tick_rate + (0.05 if slow_timer > 0 else 0)
+            while accumulator >= tick_length and state.running:
+                accumulator -= tick_length
+                # One queued turn per player per tick
+                actions = {PLAYER: inputs[PLAYER].pop(state.direction)}
+                if PLAYER2 in inputs:
+                    actions[PLAYER2] = inputs[PLAYER2].pop(state.direction2)
+
+                # All game rules (movement, letters, AI, eagle) live in game_state.step
+                previous = positions(state)
+                replay.record(actions)
+                frame_profiler.tick()
+                play_events(step(state, actions), effects_rng)
+                if slow_timer > 0: slow_timer -= 1
+                if ai_slow_timer > 0: ai_slow_timer -= 1
+            if not state.running:
                 break
 
-            if ai_index == len(word):
-                pygame.mixer.Sound.play(WORD_SOUND)
-                ai_score += 3
-                word = get_random_word()
-                player_index = 0
-                ai_index = 0
-                if mode == "vs_ai_human2":
-                    player2_index = 0
-                letters = spawn_letters(word, snake, ai_snake, snake2)
-                occupied = snake + ai_snake + [(l[0], l[1]) for l in letters]
-                if snake2:
-                    occupied += snake2
-                obstacles = spawn_obstacles(5 + max(player_score, player2_score if mode == "vs_ai_human2" else player_score) // 5, occupied)
-                eagle_list = [o for o in obstacles if o[2] == 'eagle']
-                if eagle_list:
-                    eagle_pos = [eagle_list[0][0], eagle_list[0][1]]
-
-            # Eagle logic
-            if eagle_pos:
-                eagle_tick += 1
-                if eagle_tick % 5 == 0:
-                    path = astar((eagle_pos[0], eagle_pos[1]), snake[0], [], WIDTH, HEIGHT, obstacles)
-                    if path:
-                        eagle_pos[0], eagle_pos[1] = path[0]
-                        if (eagle_pos[0], eagle_pos[1]) == snake[0]:
-                            running = False
-                            break
-                for i, o in enumerate(obstacles):
-                    if o[2] == 'eagle':
-                        obstacles[i] = (eagle_pos[0], eagle_pos[1], 'eagle')
-
-            draw_game(snake, ai_snake, letters, word, player_index, ai_index, player_score, ai_score, obstacles, mode, snake2, player2_index)
-
-            # Apply slowdown
-            delay = 0.05 if slow_timer > 0 else 0
-            ai_delay = 0.05 if ai_slow_timer > 0 else 0
-            if slow_timer > 0: slow_timer -= 1
-            if ai_slow_timer > 0: ai_slow_timer -= 1
-            pygame.time.delay(int(delay * 1000))
-            clock.tick(FPS)
+            with frame_profiler.span("draw"):
+                draw_state(state, previous, accumulator / tick_length)
+            frame_profiler.end_frame()
 
+        save_replay(replay, state)
+        report_input_latency(inputs)
         if mode == "vs_ai_human2":
-            if not show_scorecard(player_score, ai_score, player2_score):
+            if not show_scorecard(state.player_score, state.ai_score, state.player2_score):
                 break
         else:
-            if not show_scorecard(player_score, ai_score):
+            if not show_scorecard(state.player_score, state.ai_score):
                 break
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        # Let the CSV writer finish what is queued
+        frame_profiler.close()
\ No newline at end of file
@@ -0,0 +1,131 @@
+import os
+import struct
+import threading
+import time
+
+# Loading of the heavier game assets off the path to the first menu frame:
+# things the menu doesn't need are either loaded on first use or handed to a
+# background thread while the menu is already animating.
+
+
+class StartupProfile:
+    """Times each start-up phase; with --profile-startup a report is printed at the first frame."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+        self.background = []
+        self.reported = False
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        # Time since the previous mark goes to phase name
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def record_background(self, name, seconds):
+        with self.lock:
+            done = time.perf_counter() - self.start
+            self.background.append((name, seconds, done))
+            if self.enabled and self.reported:
+                print(f"  [background] {name:<16} {seconds * 1000:8.1f} ms  (ready at {done * 1000:.1f} ms)")
+
+    def first_frame(self):
+        if self.reported:
+            return
+        self.mark("first frame")
+        with self.lock:
+            self.reported = True
+            if self.enabled:
+                print("\n".join(self.report()))
+
+    def report(self):
+        lines = ["Startup profile:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<29} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'time to first frame':<29} {(self.last - self.start) * 1000:8.1f} ms")
+        for name, seconds, done in self.background:
+            lines.append(f"  [background] {name:<16} {seconds * 1000:8.1f} ms  (ready at {done * 1000:.1f} ms)")
+        return lines
+
+
+PCM_MAGIC = b"WSPCM1\n\0"
+PCM_HEADER = struct.Struct("<8sQQiii")
+
+
+def load_sound(path):
+    """pygame Sound for path, decoded once and read back as raw PCM from path + ".pcm" after that.
+
+    The cache is tied to the source file's size/mtime and the mixer format,
+    and is simply redone when either changes. A missing or broken file gives
+    a silent sound.
+    """
+    # Imported here so creating a StartupProfile before pygame can time its import
+    import pygame
+    try:
+        st = os.stat(path)
+        stamp = (PCM_MAGIC, st.st_size, st.st_mtime_ns, *pygame.mixer.get_init())
+        cache = path + ".pcm"
+        try:
+            with open(cache, "rb") as f:
+                data = f.read()
+            if len(data) > PCM_HEADER.size and PCM_HEADER.unpack_from(data) == stamp:
+                return pygame.mixer.Sound(buffer=data[PCM_HEADER.size:])
+        except OSError:
+            pass
+        sound = pygame.mixer.Sound(path)
+        try:
+            with open(cache, "wb") as f:
+                f.write(PCM_HEADER.pack(*stamp))
+                f.write(sound.get_raw())
+        except OSError:
+            pass
+        return sound
+    except (OSError, TypeError, pygame.error):
+        return pygame.mixer.Sound(buffer=bytearray(44))
+
+
+class Assets:
+    """Named assets, each built by a loader the first time it is asked for.
+
+    preload() builds some of them on a background thread; get() on one that
+    is still loading waits for it rather than loading it twice.
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.loaders = {}
+        self.loaded = {}
+        self.lock = threading.RLock()
+        self.threads = []
+
+    def register(self, name, loader):
+        self.loaders[name] = loader
+
+    def get(self, name):
+        asset = self.loaded.get(name)
+        if asset is not None:
+            return asset
+        with self.lock:
+            if name not in self.loaded:
+                self.loaded[name] = self.loaders[name]()
+            return self.loaded[name]
+
+    def preload(self, names):
+        def run():
+            for name in names:
+                t = time.perf_counter()
+                self.get(name)
+                if self.profile:
+                    self.profile.record_background(name, time.perf_counter() - t)
+        thread = threading.Thread(target=run, name="asset-preload", daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def wait(self):
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
@@ -0,0 +1,213 @@
+from array import array
+
+# Occupancy grid for the arena. Every cell of the board is one byte in a flat
+# bytearray saying who is standing there, so "is this cell taken?" is a single
+# index instead of a scan over every snake segment and obstacle.
+
+EMPTY = 0
+PLAYER_CELL = 1
+PLAYER2_CELL = 2
+AI_CELL = 3
+WATER_CELL = 4
+FIRE_CELL = 5
+PIT_CELL = 6
+
+# 256-entry table of the owners eagles can't cross, indexed by a cell's owner byte
+OBSTACLES_ONLY = bytes(1 if code >= WATER_CELL else 0 for code in range(256))
+
+obstacle_cell = {
+    "water": WATER_CELL,
+    "fire": FIRE_CELL,
+    "pit": PIT_CELL,
+}
+
+
+# How many cell changes Board keeps around for incremental consumers
+CHANGE_LOG_LIMIT = 4096
+
+
+class FreeCells:
+    """The free cells of a region in a flat array, with each cell's slot in it.
+
+    A cell is free while nobody holds it (a snake, an obstacle, a letter...).
+    Taking or freeing a cell swaps it with the last entry, so both are O(1),
+    and sample() draws k distinct free cells with a partial Fisher-Yates
+    shuffle: O(k), no retries however crowded the board is.
+    """
+
+    def __init__(self, size, region):
+        # Typed arrays rather than lists of ints, four bytes a cell on any board size
+        self.holds = array("i", bytes(4 * size))
+        self.cells = array("i", region)
+        # slot[i] is where cell i sits in self.cells, -1 if it is taken or outside the region
+        self.slot = array("i", [-1]) * size
+        for k, i in enumerate(self.cells):
+            self.slot[i] = k
+        self.region = bytearray(size)
+        for i in self.cells:
+            self.region[i] = 1
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, i):
+        return self.slot[i] >= 0
+
+    def is_free(self, i):
+        # Held by nobody, whether or not i is in the region
+        return self.holds[i] == 0
+
+    def hold(self, i):
+        self.holds[i] += 1
+        k = self.slot[i]
+        if k >= 0:
+            last = self.cells.pop()
+            if last != i:
+                self.cells[k] = last
+                self.slot[last] = k
+            self.slot[i] = -1
+
+    def unhold(self, i):
+        self.holds[i] -= 1
+        if self.holds[i] == 0 and self.region[i]:
+            self.slot[i] = len(self.cells)
+            self.cells.append(i)
+
+    def swap(self, a, b):
+        cells, slot = self.cells, self.slot
+        cells[a], cells[b] = cells[b], cells[a]
+        slot[cells[a]] = a
+        slot[cells[b]] = b
+
+    def sample(self, k, rng):
+        # k distinct free cells; the caller is expected to hold them
+        n = len(self.cells)
+        if k > n:
+            raise ValueError(f"need {k} free cells, only {n} left")
+        for j in range(k):
+            self.swap(j, rng.randrange(j, n))
+        return self.cells[:k]
+
+    def pick(self, rng, accept):
+        # One random free cell passing accept(), trying every cell at most once
+        n = len(self.cells)
+        for j in range(n):
+            self.swap(j, rng.randrange(j, n))
+            if accept(self.cells[j]):
+                return self.cells[j]
+        raise ValueError("no free cell left that fits")
+
+
+class Board:
+    """Cell-indexed occupancy map, kept up to date as snakes move and obstacles respawn.
+
+    Positions are the pixel tuples the rest of the game uses; the eagle is not
+    written into the grid because it flies over snakes and letters, it lives in
+    its own small set of cell indices instead.
+
+    Every change is also appended to a short log so planners that keep state
+    between ticks can ask what changed since they last looked.
+    """
+
+    def __init__(self, width, height, grid_size, index_free=True):
+        self.grid_size = grid_size
+        self.width = width
+        self.height = height
+        # Any (x, y) with 0 <= x < width is a legal position, so round up
+        self.cols = -(-width // grid_size)
+        self.rows = -(-height // grid_size)
+        self.cells = bytearray(self.cols * self.rows)
+        # Spawning only uses cells that are fully on screen
+        self.full_cols = width // grid_size
+        self.full_rows = height // grid_size
+        # Boards that only ever spawn in a small area around the players can
+        # skip listing every cell; FreeCells.is_free() still works there
+        region = (r * self.cols + c for c in range(self.full_cols) for r in range(self.full_rows)) if index_free else ()
+        self.free = FreeCells(self.cols * self.rows, region)
+        self.obstacle_cells = []
+        self.eagles = set()
+        self.changes = []
+        self.log_start = 0
+
+    @property
+    def version(self):
+        return self.log_start + len(self.changes)
+
+    def changed_since(self, version):
+        # Cells touched after version, or None if the log doesn't reach back that far
+        if version is None or version < self.log_start:
+            return None
+        return self.changes[version - self.log_start:]
+
+    def touch(self, i):
+        self.changes.append(i)
+        if len(self.changes) > CHANGE_LOG_LIMIT:
+            half = CHANGE_LOG_LIMIT // 2
+            del self.changes[:half]
+            self.log_start += half
+
+    def index(self, pos):
+        x, y = pos
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return -1
+        return (y // self.grid_size) * self.cols + x // self.grid_size
+
+    def position(self, index):
+        return ((index % self.cols) * self.grid_size, (index // self.cols) * self.grid_size)
+
+    def owner(self, pos):
+        i = self.index(pos)
+        return EMPTY if i < 0 else self.cells[i]
+
+    def set_cell(self, i, owner):
+        # Every write goes through here so the free-cell index stays in step
+        old = self.cells[i]
+        self.cells[i] = owner
+        if old == EMPTY and owner != EMPTY:
+            self.free.hold(i)
+        elif old != EMPTY and owner == EMPTY:
+            self.free.unhold(i)
+        self.touch(i)
+
+    def occupy(self, pos, owner):
+        self.set_cell(self.index(pos), owner)
+
+    def release(self, pos):
+        self.set_cell(self.index(pos), EMPTY)
+
+    def fill(self, positions, owner):
+        for pos in positions:
+            self.occupy(pos, owner)
+
+    def blocked(self, pos):
+        # Walls, snakes, obstacles and eagles all kill
+        i = self.index(pos)
+        return i < 0 or self.cells[i] != EMPTY or i in self.eagles
+
+    def is_blocked(self, i):
+        return self.cells[i] != EMPTY or i in self.eagles
+
+    def has_obstacle(self, pos):
+        i = self.index(pos)
+        return i >= 0 and (self.cells[i] >= WATER_CELL or i in self.eagles)
+
+    def set_obstacles(self, obstacles):
+        for i in self.obstacle_cells:
+            if self.cells[i] >= WATER_CELL:
+                self.set_cell(i, EMPTY)
+        self.obstacle_cells = []
+        eagles = []
+        for x, y, t in obstacles:
+            if t == "eagle":
+                eagles.append((x, y))
+            else:
+                i = self.index((x, y))
+                self.set_cell(i, obstacle_cell[t])
+                self.obstacle_cells.append(i)
+        self.set_eagles(eagles)
+
+    def set_eagles(self, positions):
+        eagles = {self.index(pos) for pos in positions}
+        for i in eagles ^ self.eagles:
+            self.touch(i)
+        self.eagles = eagles
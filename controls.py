@@ -0,0 +1,70 @@
+import time
+from collections import deque
+
+from game_state import turn
+
+# Turn requests buffered between ticks: every KEYDOWN is queued the moment
+# it arrives and each tick takes at most one, so a tap shorter than a tick
+# still counts and two quick turns (up then left) become two moves instead
+# of one.
+
+# More than this many turns ahead stops feeling like control
+MAX_QUEUED = 3
+
+
+class DirectionQueue:
+    """One player's pending turns, oldest first.
+
+    push() only queues a turn that makes sense after the one before it: no
+    reversal and no repeat of the same direction. pop() hands out one turn
+    per tick and notes how long it waited, see latency_report().
+    """
+
+    def __init__(self, size=MAX_QUEUED, clock=time.perf_counter):
+        self.pending = deque()
+        self.size = size
+        self.clock = clock
+        # Seconds from KEYDOWN to the tick that moved the snake, recent turns only
+        self.latencies = deque(maxlen=512)
+        self.dropped = 0
+
+    def clear(self):
+        self.pending.clear()
+
+    def push(self, direction, heading):
+        # heading is where the snake goes now; checked against the last queued turn if there is one
+        last = self.pending[-1][0] if self.pending else heading
+        if last is not None and (direction == last or turn(last, direction) != direction):
+            return False
+        if len(self.pending) >= self.size:
+            self.dropped += 1
+            return False
+        self.pending.append((direction, self.clock()))
+        return True
+
+    def pop(self, heading):
+        # Next turn for this tick, or None to keep going
+        while self.pending:
+            direction, pressed = self.pending.popleft()
+            # A respawn can change the heading under a queued turn
+            if heading is None or turn(heading, direction) == direction != heading:
+                self.latencies.append(self.clock() - pressed)
+                return direction
+        return None
+
+    def latency_report(self, name):
+        if not self.latencies:
+            return f"{name}: no turns"
+        ms = sorted(t * 1000 for t in self.latencies)
+        return (f"{name}: {len(ms)} turns, input to move median {ms[len(ms) // 2]:.1f} ms, "
+                f"p95 {ms[min(len(ms) - 1, len(ms) * 95 // 100)]:.1f} ms, max {ms[-1]:.1f} ms, "
+                f"{self.dropped} dropped (queue full)")
+
+
+def queue_keys(event, bindings, queue, heading):
+    # Queue the turn for a KEYDOWN in bindings; True if the event was one of them
+    for key, direction in bindings:
+        if event.key == key:
+            queue.push(direction, heading)
+            return True
+    return False
@@ -0,0 +1,225 @@
+import mmap
+import os
+import struct
+import sys
+
+# The game's word list as prebuilt files instead of nltk at start-up.
+#
+#   python dictionary.py            builds words.dat / words.trie / words.pool from nltk's "words" corpus
+#   python dictionary.py list.txt   builds them from a plain one-word-per-line file
+#
+# words.dat is a sorted, newline-packed blob of lowercase words behind an
+# offset table, so a lookup is a binary search straight on the memory-mapped
+# file: nothing is parsed or loaded into Python objects, and no network.
+# words.trie is the same words as a prefix tree for spelling a word one
+# letter at a time, see PrefixTrie.
+
+DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.dat")
+TRIE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.trie")
+
+MAGIC = b"WSDICT1\n"
+HEADER = struct.Struct("<8sI")
+TRIE_MAGIC = b"WSTRIE1\n"
+TRIE_HEADER = struct.Struct("<8sII")
+
+# Trie node of a prefix no word starts with
+DEAD = -1
+ROOT = 0
+
+
+def encode(words):
+    return sorted({w.strip().lower().encode("utf-8") for w in words if w.strip()})
+
+
+def build(words, path=DICTIONARY_PATH, trie_path=TRIE_PATH):
+    """Write words (any iterable of str) to path and trie_path; returns how many distinct words were stored."""
+    entries = encode(words)
+    offsets = []
+    pos = 0
+    for entry in entries:
+        offsets.append(pos)
+        pos += len(entry) + 1
+    offsets.append(pos)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(entries)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for entry in entries:
+            f.write(entry + b"\n")
+    with open(trie_path, "wb") as f:
+        f.write(trie_bytes(entries))
+    return len(entries)
+
+
+class WordList:
+    """Read-only set of words backed by a words.dat file, opened on the first lookup.
+
+    A missing file behaves like an empty list, so the game still runs (with
+    only its built-in words) before the build step has been done.
+    """
+
+    def __init__(self, path=DICTIONARY_PATH):
+        self.path = path
+        self.data = None
+        self.count = 0
+        self.offsets = ()
+        self.blob = 0
+
+    def load(self):
+        if self.data is not None:
+            return
+        self.data = b""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= HEADER.size:
+            return
+        with open(self.path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a word list built by dictionary.py")
+        self.data = data
+        self.count = count
+        self.blob = HEADER.size + (count + 1) * 4
+        self.offsets = memoryview(data)[HEADER.size:self.blob].cast("I")
+
+    def word(self, k):
+        return self.data[self.blob + self.offsets[k]:self.blob + self.offsets[k + 1] - 1]
+
+    def __contains__(self, word):
+        self.load()
+        key = word.lower().encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self.count and self.word(lo) == key
+
+    def __len__(self):
+        self.load()
+        return self.count
+
+
+def trie_bytes(entries):
+    """Serialise sorted byte strings as a trie.
+
+    Nodes are numbered breadth first, so a node's children are consecutive
+    and child k of the whole tree is edge k - 1: the file only needs, per
+    node, where its edges start (uint32) and whether it ends a word, plus
+    one label byte per edge.
+    """
+    root = {}
+    for entry in entries:
+        node = root
+        for b in entry:
+            node = node.setdefault(b, {})
+        node[-1] = True
+    first = []
+    terminal = bytearray()
+    labels = bytearray()
+    queue = [root]
+    for node in queue:
+        first.append(len(labels))
+        terminal.append(1 if -1 in node else 0)
+        for b in sorted(k for k in node if k >= 0):
+            labels.append(b)
+            queue.append(node[b])
+    first.append(len(labels))
+    return (TRIE_HEADER.pack(TRIE_MAGIC, len(queue), len(labels)) + struct.pack(f"<{len(first)}I", *first)
+            + bytes(terminal) + bytes(labels))
+
+
+class PrefixTrie:
+    """Letter-by-letter word checking on a trie from words.trie (or from_words()).
+
+    A speller keeps one int, its node: step(node, letter) is the node after
+    one more letter, DEAD once no word starts that way, and is_word(node)
+    says whether the letters so far spell a word. Both are a couple of
+    lookups in the memory-mapped file, whatever the size of the dictionary.
+    """
+
+    def __init__(self, path=TRIE_PATH, data=None):
+        self.path = path
+        self.data = data
+        self.count = 0
+        self.first = ()
+        self.terminal = 0
+        self.labels = 0
+        if data is not None:
+            self.parse(data)
+
+    @classmethod
+    def from_words(cls, words):
+        return cls(None, trie_bytes(encode(words)))
+
+    def load(self):
+        if self.data is not None:
+            return
+        self.data = b""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= TRIE_HEADER.size:
+            return
+        with open(self.path, "rb") as f:
+            self.parse(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def parse(self, data):
+        magic, nodes, edges = TRIE_HEADER.unpack_from(data, 0)
+        if magic != TRIE_MAGIC:
+            raise ValueError(f"{self.path} is not a trie built by dictionary.py")
+        self.data = data
+        self.count = nodes
+        self.terminal = TRIE_HEADER.size + (nodes + 1) * 4
+        self.first = memoryview(data)[TRIE_HEADER.size:self.terminal].cast("I")
+        self.labels = self.terminal + nodes
+
+    def __len__(self):
+        self.load()
+        return self.count
+
+    def step(self, node, letter):
+        self.load()
+        if node < 0 or node >= self.count:
+            return DEAD
+        key = letter.lower().encode("utf-8")
+        if len(key) != 1:
+            # Board letters are plain A-Z, one byte each
+            return DEAD
+        e = self.data.find(key, self.labels + self.first[node], self.labels + self.first[node + 1])
+        return DEAD if e < 0 else e - self.labels + 1
+
+    def follow(self, prefix, node=ROOT):
+        for letter in prefix:
+            node = self.step(node, letter)
+        return node
+
+    def is_word(self, node):
+        self.load()
+        return 0 <= node < self.count and self.data[self.terminal + node] == 1
+
+    def next_letters(self, node):
+        # Uppercase letters that keep node alive, e.g. "AEO" after "c"
+        self.load()
+        if node < 0 or node >= self.count:
+            return ""
+        return bytes(self.data[self.labels + self.first[node]:self.labels + self.first[node + 1]]).decode("latin-1").upper()
+
+
+valid_words = WordList()
+valid_prefixes = PrefixTrie()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            source = f.read().split()
+    else:
+        # Only the build step needs nltk
+        import nltk
+        from nltk.corpus import words
+        nltk.download("words")
+        source = words.words()
+    # The game's own target words must always be spellable
+    from game_state import short_valid_words
+    print(f"{build(list(source) + list(short_valid_words))} words written to {DICTIONARY_PATH} and {TRIE_PATH}")
+    # Index the target-word tiers now rather than on the first game
+    from word_pool import WordPool, POOL_PATH
+    print(f"word tiers {WordPool().sizes()} written to {POOL_PATH}")
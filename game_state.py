@@ -0,0 +1,504 @@
+import hashlib
+import itertools
+import random
+from board import Board, PLAYER_CELL, PLAYER2_CELL, AI_CELL, OBSTACLES_ONLY
+from pathfinding import GridPathfinder, IncrementalPlanner, DistanceField, CooperativePlanner
+from snake import Snake
+from letters import LetterField
+from dictionary import valid_prefixes, PrefixTrie, DEAD, ROOT
+from word_pool import WordPool, level, obstacle_count
+from profiler import frame_profiler
+
+# Display-free game rules. Nothing in here touches pygame, so a game can be
+# advanced as fast as the CPU allows (AI evaluation, regression runs) and the
+# window in ai_word_snake_main.py only has to draw whatever state it gets back.
+
+WIDTH, HEIGHT = 1550, 775
+GRID_SIZE = 20
+
+# Boards can be bigger than the window (GameState(board_size=(cols, rows))).
+# There every word's letters and obstacles are laid out in a window-sized
+# area around the human players rather than over the whole board, and
+# eagles only hunt snakes within EAGLE_RANGE cells, so no tick does work
+# that grows with the board.
+SPAWN_COLS, SPAWN_ROWS = WIDTH // GRID_SIZE, HEIGHT // GRID_SIZE
+EAGLE_RANGE = 40
+
+OBSTACLE_TYPES = ["water", "fire", "pit", "eagle"]
+
+PLAYER = "player"
+PLAYER2 = "player2"
+AI = "ai"
+
+# Free-form mode: instead of chasing the target word, every snake spells any
+# dictionary word it likes from the letters it collects
+FREE_FORM = "free_vs_ai"
+
+short_valid_words = {
+    "cat", "dog", "car", "sun", "run", "red", "man", "fun", "cup", "map", "top", "toy", "box", "fox", "log",
+    "yes", "hat", "bat", "rat", "mat", "pot", "pen", "can", "win", "bus", "net", "dot", "fan", "bed", "egg",
+    "four", "five", "cool", "look", "make", "game", "word", "play", "code", "read"
+}
+
+layout_ids = itertools.count(1)
+
+_fallback_trie = None
+
+def word_trie():
+    # The prebuilt dictionary if there is one, else just the built-in short words
+    global _fallback_trie
+    if len(valid_prefixes):
+        return valid_prefixes
+    if _fallback_trie is None:
+        _fallback_trie = PrefixTrie.from_words(short_valid_words)
+    return _fallback_trie
+
+# Target words by difficulty tier, built from the dictionary (or the words above)
+word_pool = WordPool(fallback=short_valid_words)
+
+def get_random_word(tier=0, rng=random):
+    return word_pool.sample(tier, rng)
+
+def fits_window(cols, rows):
+    return cols <= SPAWN_COLS and rows <= SPAWN_ROWS
+
+def spawn_area(board, around=()):
+    """Cell rectangle (c0, r0, c1, r1) new things spawn in, None for the whole board.
+
+    Only boards bigger than the window have one: SPAWN_COLS x SPAWN_ROWS
+    centred on the positions in around (or the middle of the board), kept
+    inside the board.
+    """
+    if fits_window(board.full_cols, board.full_rows):
+        return None
+    if around:
+        c = sum(x for x, y in around) // len(around) // board.grid_size
+        r = sum(y for x, y in around) // len(around) // board.grid_size
+    else:
+        c, r = board.full_cols // 2, board.full_rows // 2
+    c0 = min(max(c - SPAWN_COLS // 2, 0), max(board.full_cols - SPAWN_COLS, 0))
+    r0 = min(max(r - SPAWN_ROWS // 2, 0), max(board.full_rows - SPAWN_ROWS, 0))
+    return c0, r0, min(c0 + SPAWN_COLS, board.full_cols), min(r0 + SPAWN_ROWS, board.full_rows)
+
+def free_cells(board, k, rng, area=None):
+    # k distinct free cells, from the free-cell index or by scanning the spawn area
+    if area is None:
+        return board.free.sample(k, rng)
+    c0, r0, c1, r1 = area
+    cells = [r * board.cols + c for r in range(r0, r1) for c in range(c0, c1) if board.free.is_free(r * board.cols + c)]
+    if k > len(cells):
+        raise ValueError(f"need {k} free cells, only {len(cells)} left")
+    return rng.sample(cells, k)
+
+def safe_spawn(board, rng=random, area=None):
+    # A free cell at least two cells away from every edge
+    cols, rows = board.full_cols, board.full_rows
+    def inside(i):
+        c, r = i % board.cols, i // board.cols
+        return 2 <= c <= cols - 3 and 2 <= r <= rows - 3
+    if area is None:
+        return board.position(board.free.pick(rng, inside))
+    c0, r0, c1, r1 = area
+    cells = [r * board.cols + c for r in range(r0, r1) for c in range(c0, c1)
+             if board.free.is_free(r * board.cols + c) and inside(r * board.cols + c)]
+    if not cells:
+        raise ValueError("no free cell left that fits")
+    return board.position(rng.choice(cells))
+
+def spawn_letters(word, board, rng=random, area=None):
+    # Three copies of every letter on distinct free cells, drawn in one go
+    letters = [letter.upper() for letter in word for _ in range(3)]
+    return [(*board.position(i), ch) for i, ch in zip(free_cells(board, len(letters), rng, area), letters)]
+
+def spawn_obstacles(num, board, types=OBSTACLE_TYPES, rng=random, area=None):
+    return [(*board.position(i), rng.choice(types)) for i in free_cells(board, num, rng, area)]
+
+def turn(direction, requested):
+    # A snake can never reverse straight into its own neck
+    if requested is None or requested == (-direction[0], -direction[1]):
+        return direction
+    return requested
+
+
+class GameState:
+    """Everything one game needs between two ticks: snakes, letters, obstacles, scores."""
+
+    def __init__(self, mode="vs_ai", extra_eagles=0, trie=None, seed=None, board_size=None, ai_count=1,
+                 cooperative=None):
+        self.mode = mode
+        # Every random choice in a game comes from this one generator, so the
+        # seed plus the players' inputs reproduce the whole game (see replay.py)
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.free_form = mode == FREE_FORM
+        self.extra_eagles = extra_eagles
+        # In cells; None is the classic board filling the window
+        self.board_size = board_size
+        if board_size is None:
+            self.board = Board(WIDTH, HEIGHT, GRID_SIZE)
+        else:
+            self.board = Board(board_size[0] * GRID_SIZE, board_size[1] * GRID_SIZE, GRID_SIZE,
+                               index_free=fits_window(*board_size))
+        area = spawn_area(self.board)
+        self.eagle_range = None if area is None else EAGLE_RANGE
+        self.pathfinder = GridPathfinder(self.board.cols, self.board.rows, GRID_SIZE)
+        # One AI snake keeps its search tree between ticks (IncrementalPlanner);
+        # a team of them is planned jointly every tick (CooperativePlanner)
+        self.ai_count = ai_count
+        self.cooperative = ai_count > 1 if cooperative is None else cooperative
+        if self.cooperative:
+            self.ai_planner = CooperativePlanner(self.board, self.pathfinder, OBSTACLES_ONLY,
+                                                 limit=None if area is None else SPAWN_COLS + SPAWN_ROWS)
+        else:
+            # On a big board a search gets a window's worth of cells per tick
+            self.ai_planner = IncrementalPlanner(self.board, self.pathfinder,
+                                                 budget=None if area is None else SPAWN_COLS * SPAWN_ROWS)
+        # Eagles fly over snakes and letters, only water/fire/pits are in their way
+        self.eagle_field = DistanceField(self.board, self.pathfinder, OBSTACLES_ONLY)
+        self.snake = Snake([safe_spawn(self.board, self.rng, area)])
+        self.board.fill(self.snake, PLAYER_CELL)
+        self.ai_snake = Snake([safe_spawn(self.board, self.rng, area)])
+        self.board.fill(self.ai_snake, AI_CELL)
+        self.snake2 = None
+        self.direction = (GRID_SIZE, 0)
+        self.direction2 = None
+        if mode == "vs_ai_human2":
+            self.snake2 = Snake([safe_spawn(self.board, self.rng, area)])
+            self.direction2 = (-GRID_SIZE, 0)
+            self.board.fill(self.snake2, PLAYER2_CELL)
+        # Every AI snake works on the same word and shares ai_index / ai_score
+        self.ai_snakes = [self.ai_snake]
+        for _ in range(ai_count - 1):
+            self.ai_snakes.append(Snake([safe_spawn(self.board, self.rng, area)]))
+            self.board.fill(self.ai_snakes[-1], AI_CELL)
+
+        self.player_index = 0
+        self.player2_index = 0
+        self.ai_index = 0
+        self.player_score = 0
+        self.player2_score = 0
+        self.ai_score = 0
+        self.ai_freeze_timer = 0
+        # Free-form mode: what each snake has spelled so far and its trie node
+        self.trie = trie or (word_trie() if self.free_form else None)
+        self.prefix = {PLAYER: "", PLAYER2: "", AI: ""}
+        self.prefix_node = {PLAYER: ROOT, PLAYER2: ROOT, AI: ROOT}
+        self.eagles = []
+        self.eagle_tick = 0
+        self.tick = 0
+        self.running = True
+        # (kind, who, position) tuples produced by the last step(), e.g. for sounds
+        self.events = []
+
+        self.word = get_random_word(self.difficulty(), self.rng)
+        self.letters = LetterField()
+        self.obstacles = []
+        # New id whenever letters/obstacles are laid out afresh (unique across
+        # games too), so renderers know when their cached board layer is stale
+        self.layout = None
+        self.respawn()
+
+    def respawn(self):
+        self.layout = next(layout_ids)
+        board = self.board
+        # Old letters and obstacles make way first, then new ones are drawn
+        # from the board's free-cell index, letters held so obstacles avoid them
+        for x, y, ch in self.letters:
+            board.free.unhold(board.index((x, y)))
+        board.set_obstacles([])
+        # On a big board, around wherever the humans are now
+        area = spawn_area(board, [self.snake.head] + ([self.snake2.head] if self.snake2 else []))
+        self.letters = LetterField(spawn_letters(self.word, board, self.rng, area))
+        for x, y, ch in self.letters:
+            board.free.hold(board.index((x, y)))
+        num = obstacle_count(max(self.player_score, self.player2_score))
+        # Extra eagles are drawn in the same batch so they get cells of their own
+        self.obstacles = spawn_obstacles(num + self.extra_eagles, board, rng=self.rng, area=area)
+        self.obstacles[num:] = [(x, y, "eagle") for x, y, t in self.obstacles[num:]]
+        board.set_obstacles(self.obstacles)
+        self.eagles = [(o[0], o[1]) for o in self.obstacles if o[2] == 'eagle']
+
+    def difficulty(self):
+        # Word tier and obstacle count both follow the best human score
+        return level(max(self.player_score, self.player2_score))
+
+    def next_word(self, who, freeze=0):
+        self.events.append(("word", who, None))
+        if freeze:
+            self.ai_freeze_timer = freeze
+        self.word = get_random_word(self.difficulty(), self.rng)
+        # Everybody starts the new word from scratch
+        self.player_index = 0
+        self.player2_index = 0
+        self.ai_index = 0
+        for who in self.prefix:
+            self.prefix[who] = ""
+            self.prefix_node[who] = ROOT
+        self.respawn()
+
+    def letters_usable(self):
+        # Free-form: can anybody still pick up one of the letters on the board?
+        # A letter that extends nobody's word but starts a new one still counts.
+        nodes = {ROOT, self.prefix_node[PLAYER], self.prefix_node[AI]}
+        if self.snake2:
+            nodes.add(self.prefix_node[PLAYER2])
+        return any(self.trie.step(node, ch) != DEAD for ch in self.letters.present() for node in nodes)
+
+    def refill(self):
+        # Fresh letters once the board has none anybody can use; words in progress carry on
+        self.word = get_random_word(self.difficulty(), self.rng)
+        self.respawn()
+
+    def take_letter(self, pos, index):
+        # Removes the letter at pos if it is the one wanted next
+        if self.letters.take(pos, self.word[index].upper()):
+            self.board.free.unhold(self.board.index(pos))
+            return True
+        return False
+
+    def take_free_letter(self, who, pos):
+        # Free-form pickup: the letter has to keep who's word spellable.
+        # One that no word continues with starts a new word instead.
+        ch = self.letters.get(pos)
+        if ch is None:
+            return False
+        prefix = self.prefix[who]
+        node = self.trie.step(self.prefix_node[who], ch)
+        if node == DEAD:
+            prefix = ""
+            node = self.trie.step(ROOT, ch)
+            if node == DEAD:
+                return False
+        self.letters.remove(pos)
+        self.board.free.unhold(self.board.index(pos))
+        self.prefix[who] = prefix + ch
+        self.prefix_node[who] = node
+        return True
+
+    def collect(self, who, pos, index):
+        # who's letter count after trying to pick up pos, None if it didn't
+        if self.free_form:
+            return len(self.prefix[who]) if self.take_free_letter(who, pos) else None
+        return index + 1 if self.take_letter(pos, index) else None
+
+    def word_complete(self, who, index):
+        if self.free_form:
+            return index >= 3 and self.trie.is_word(self.prefix_node[who])
+        return index == len(self.word)
+
+    def ai_targets(self):
+        # Positions of every letter the AI would pick up next
+        if not self.free_form:
+            return self.letters.positions_of(self.word[self.ai_index].upper())
+        # Letters that extend its word, or failing that ones that start a new one
+        for node in (self.prefix_node[AI], ROOT):
+            targets = [pos for ch in self.trie.next_letters(node) for pos in self.letters.positions_of(ch)]
+            if targets:
+                return targets
+        return ()
+
+    def game_over(self, who):
+        self.events.append(("game_over", who, None))
+        self.running = False
+
+    def lose_ai_snake(self, k):
+        # The AI only loses once its last snake is gone; before that a crashed one just leaves the board
+        if len(self.ai_snakes) == 1:
+            self.game_over(AI)
+            return
+        snake = self.ai_snakes.pop(k)
+        for pos in set(snake):
+            if self.board.owner(pos) == AI_CELL and not any(pos in other for other in self.ai_snakes):
+                self.board.release(pos)
+        self.ai_snake = self.ai_snakes[0]
+        self.events.append(("ai_lost", AI, snake.head))
+
+
+def _move_player(state, actions):
+    state.direction = turn(state.direction, actions.get(PLAYER))
+    snake = state.snake
+    new_head = (snake.head[0] + state.direction[0], snake.head[1] + state.direction[1])
+    if state.board.blocked(new_head):
+        state.game_over(PLAYER)
+        return
+
+    state.board.occupy(new_head, PLAYER_CELL)
+    index = state.collect(PLAYER, new_head, state.player_index)
+    if index is not None:
+        snake.grow(new_head)
+        state.events.append(("eat", PLAYER, new_head))
+        state.player_index = index
+        state.player_score += 1
+    else:
+        state.board.release(snake.move(new_head))
+
+    if state.word_complete(PLAYER, state.player_index):
+        state.player_score += 3
+        state.next_word(PLAYER, freeze=50)
+
+def _move_player2(state, actions):
+    state.direction2 = turn(state.direction2, actions.get(PLAYER2))
+    snake2 = state.snake2
+    new_head2 = (snake2.head[0] + state.direction2[0], snake2.head[1] + state.direction2[1])
+    if state.board.blocked(new_head2):
+        state.game_over(PLAYER2)
+        return
+
+    state.board.occupy(new_head2, PLAYER2_CELL)
+    index = state.collect(PLAYER2, new_head2, state.player2_index)
+    if index is not None:
+        snake2.grow(new_head2)
+        state.events.append(("eat", PLAYER2, new_head2))
+        state.player2_index = index
+        state.player2_score += 1
+    else:
+        state.board.release(snake2.move(new_head2))
+
+    if state.word_complete(PLAYER2, state.player2_index):
+        state.player2_score += 3
+        state.next_word(PLAYER2, freeze=30)
+
+def _move_ai(state):
+    ai_snake = state.ai_snake
+    board = state.board
+    crashed = False
+    if state.ai_freeze_timer <= 0:
+        if state.letters and (state.free_form or state.ai_index < len(state.word)):
+            targets = state.ai_targets()
+            if targets:
+                # One backward search from every copy picks the nearest one we can reach
+                next_pos, target = state.ai_planner.plan(ai_snake.head, targets)
+                if next_pos:
+                    crashed = board.blocked(next_pos)
+                    board.occupy(next_pos, AI_CELL)
+                    index = state.collect(AI, next_pos, state.ai_index) if next_pos == target else None
+                    if index is not None:
+                        ai_snake.grow(next_pos)
+                        state.ai_index = index
+                        state.events.append(("eat", AI, next_pos))
+                        state.ai_score += 1
+                    else:
+                        board.release(ai_snake.move(next_pos))
+    else:
+        state.ai_freeze_timer -= 1
+
+    if crashed or board.has_obstacle(ai_snake.head):
+        state.game_over(AI)
+        return
+
+    if state.word_complete(AI, state.ai_index):
+        state.ai_score += 3
+        state.next_word(AI)
+
+def _move_ai_team(state):
+    board = state.board
+    crashed = []
+    if state.ai_freeze_timer <= 0:
+        if state.letters and (state.free_form or state.ai_index < len(state.word)):
+            targets = state.ai_targets()
+            if targets:
+                goals = set(targets)
+                # Everybody planned together, then moved in turn
+                moves = state.ai_planner.plan(state.ai_snakes, goals, (state.snake, state.snake2))
+                for k, (ai_snake, next_pos) in enumerate(zip(state.ai_snakes, moves)):
+                    if next_pos is None:
+                        continue
+                    if board.blocked(next_pos):
+                        crashed.append(k)
+                        continue
+                    board.occupy(next_pos, AI_CELL)
+                    index = state.collect(AI, next_pos, state.ai_index) if next_pos in goals else None
+                    if index is not None:
+                        ai_snake.grow(next_pos)
+                        state.ai_index = index
+                        state.events.append(("eat", AI, next_pos))
+                        state.ai_score += 1
+                        if state.word_complete(AI, state.ai_index):
+                            state.ai_score += 3
+                            state.next_word(AI)
+                            # The rest were planned for the old layout; they wait for the next tick
+                            break
+                    else:
+                        board.release(ai_snake.move(next_pos))
+    else:
+        state.ai_freeze_timer -= 1
+
+    crashed += [k for k, ai_snake in enumerate(state.ai_snakes)
+                if k not in crashed and board.has_obstacle(ai_snake.head)]
+    for k in sorted(crashed, reverse=True):
+        state.lose_ai_snake(k)
+        if not state.running:
+            return
+
+def _move_eagles(state):
+    state.eagle_tick += 1
+    if state.eagle_tick % 5 != 0:
+        return
+    board = state.board
+    # Every eagle hunts whichever snake head is closest
+    heads = {board.index(state.snake.head): PLAYER}
+    if state.snake2:
+        heads[board.index(state.snake2.head)] = PLAYER2
+    ai_heads = {}
+    for k, ai_snake in enumerate(state.ai_snakes):
+        heads[board.index(ai_snake.head)] = AI
+        ai_heads.setdefault(board.index(ai_snake.head), k)
+    state.eagle_field.update(list(heads), [board.index(pos) for pos in state.eagles], state.eagle_range)
+
+    caught = None
+    for k, pos in enumerate(state.eagles):
+        nxt = state.eagle_field.step(board.index(pos))
+        if nxt is not None:
+            state.eagles[k] = board.position(nxt)
+            if nxt in heads and caught is None:
+                caught = nxt
+    eagles = iter(state.eagles)
+    state.obstacles = [(*next(eagles), 'eagle') if o[2] == 'eagle' else o for o in state.obstacles]
+    board.set_eagles(state.eagles)
+    if caught is None:
+        return
+    if heads[caught] == AI:
+        state.lose_ai_snake(ai_heads[caught])
+    else:
+        state.game_over(heads[caught])
+
+def state_hash(state):
+    """Short digest of everything the rules track, for checking that a replay ended up in the same place."""
+    snapshot = (state.tick, state.running, state.word, list(state.snake), list(state.ai_snake),
+                list(state.snake2) if state.snake2 else None, list(state.letters), state.obstacles,
+                state.direction, state.direction2, state.player_index, state.player2_index, state.ai_index,
+                state.player_score, state.player2_score, state.ai_score, state.ai_freeze_timer,
+                sorted(state.prefix.items())) + tuple(list(s) for s in state.ai_snakes[1:])
+    return hashlib.blake2b(repr(snapshot).encode(), digest_size=16).digest()
+
+def step(state, actions=None):
+    """Advance the game by one tick.
+
+    actions maps PLAYER / PLAYER2 to the direction that snake should turn to
+    (or None to keep going straight). Returns the events of this tick.
+    """
+    actions = actions or {}
+    state.events = []
+    if not state.running:
+        return state.events
+    state.tick += 1
+
+    with frame_profiler.span("player"):
+        _move_player(state, actions)
+    if state.running and state.mode == "vs_ai_human2":
+        with frame_profiler.span("player2"):
+            _move_player2(state, actions)
+    if state.running:
+        with frame_profiler.span("ai"):
+            if state.cooperative:
+                _move_ai_team(state)
+            else:
+                _move_ai(state)
+    if state.running and state.eagles:
+        with frame_profiler.span("eagles"):
+            _move_eagles(state)
+    # Free-form letters are only laid out afresh when a word is finished, so
+    # a board left with nothing anybody can pick up is refilled here
+    if state.running and state.free_form and not state.letters_usable():
+        state.refill()
+    return state.events
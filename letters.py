@@ -0,0 +1,56 @@
+class LetterField:
+    """The letters lying on the board, indexed both ways.
+
+    at maps a position to its letter and positions maps a letter to the set
+    of positions holding it, so picking up, removing and "where are all the
+    Ks?" are O(1) instead of scans (and copies) of a list. Iterating yields
+    (x, y, letter) tuples like the old list did, in the order they were added.
+    """
+
+    __slots__ = ("at", "positions")
+
+    def __init__(self, letters=()):
+        self.at = {}
+        self.positions = {}
+        for x, y, ch in letters:
+            self.add((x, y), ch)
+
+    def add(self, pos, ch):
+        self.at[pos] = ch
+        self.positions.setdefault(ch, set()).add(pos)
+
+    def remove(self, pos):
+        ch = self.at.pop(pos)
+        self.positions[ch].discard(pos)
+        return ch
+
+    def take(self, pos, ch):
+        # Removes the letter at pos only if it is ch
+        if self.at.get(pos) != ch:
+            return False
+        self.remove(pos)
+        return True
+
+    def get(self, pos):
+        return self.at.get(pos)
+
+    def present(self):
+        # Every distinct letter with at least one copy on the board
+        return [ch for ch, positions in self.positions.items() if positions]
+
+    def positions_of(self, ch):
+        # Live set, don't modify it
+        return self.positions.get(ch, ())
+
+    def __contains__(self, pos):
+        return pos in self.at
+
+    def __len__(self):
+        return len(self.at)
+
+    def __iter__(self):
+        for (x, y), ch in self.at.items():
+            yield x, y, ch
+
+    def __repr__(self):
+        return f"LetterField({list(self)!r})"
@@ -0,0 +1,471 @@
+import heapq
+import time
+
+# Pathfinding on integer cell indices (row * cols + col, the same numbering as
+# board.Board). Neighbours of every cell are worked out once per board size,
+# and the planners below keep their per-cell scores in flat tables indexed
+# the same way, reading "can I step here?" straight off the board.
+
+# Grids with more cells than this fill their per-cell tables in on first use
+# instead of up front, so a huge board costs nothing for cells nobody visits
+EAGER_CELLS = 1 << 16
+
+
+class LazyTable(dict):
+    """Per-cell values worked out the first time each cell is looked up."""
+
+    __slots__ = ("compute",)
+
+    def __init__(self, compute):
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, i):
+        value = self[i] = self.compute(i)
+        return value
+
+
+class DefaultTable(dict):
+    """Per-cell values reading as default until written, without storing every cell."""
+
+    __slots__ = ("default",)
+
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, i):
+        return self.default
+
+
+def cell_table(n, compute):
+    # compute(i) for every cell: a list on normal boards, filled lazily on huge ones
+    return [compute(i) for i in range(n)] if n <= EAGER_CELLS else LazyTable(compute)
+
+
+def cell_values(n, default):
+    return [default] * n if n <= EAGER_CELLS else DefaultTable(default)
+
+
+class GridPathfinder:
+    """Cell numbering and neighbour tables of a cols x rows grid, shared by the planners below."""
+
+    def __init__(self, cols, rows, grid_size):
+        self.cols = cols
+        self.rows = rows
+        self.grid_size = grid_size
+        n = cols * rows
+        self.size = n
+        self.col = cell_table(n, lambda i: i % cols)
+        self.row = cell_table(n, lambda i: i // cols)
+        self.neighbours = cell_table(n, self.cell_neighbours)
+
+    def cell_neighbours(self, i):
+        # Same order the old code tried: up, down, left, right
+        cols = self.cols
+        c, r = i % cols, i // cols
+        nbs = []
+        if r > 0:
+            nbs.append(i - cols)
+        if r < self.rows - 1:
+            nbs.append(i + cols)
+        if c > 0:
+            nbs.append(i - 1)
+        if c < cols - 1:
+            nbs.append(i + 1)
+        return tuple(nbs)
+
+    def index(self, pos):
+        return (pos[1] // self.grid_size) * self.cols + pos[0] // self.grid_size
+
+    def position(self, index):
+        return (self.col[index] * self.grid_size, self.row[index] * self.grid_size)
+
+
+INF = float("inf")
+
+
+class IncrementalPlanner:
+    """D* Lite for a walker whose goals stay put while the board shifts a few cells per tick.
+
+    The search runs backwards from every goal at once (all copies of a letter),
+    so the walker heads for the nearest copy it can actually reach. When the
+    walker moves or a snake head/tail, obstacle or eagle changes a cell, only
+    the part of the tree those cells touch gets repaired instead of planning
+    from scratch. Goals disappearing is repaired too; a different goal set
+    (or a board change log we fell behind on) starts a new tree.
+
+    With a budget each call expands at most that many cells. A search that
+    runs out picks up where it stopped on the next call, and until it has
+    reached the walker there is no next step, so a walker boxed in on a huge
+    board costs a bounded amount per tick instead of a flood of the board.
+    """
+
+    def __init__(self, board, grid, budget=None):
+        self.board = board
+        self.grid = grid
+        self.budget = budget
+        self.goals = set()
+        self.start = None
+        self.last = None
+        self.version = None
+        self.km = 0
+        self.g = []
+        self.rhs = []
+        self.key = []
+        self.open_set = []
+        # Work counters so callers can check repairs stay small
+        self.expanded = 0
+        self.resets = 0
+
+    def h(self, a, b):
+        col, row = self.grid.col, self.grid.row
+        return abs(col[a] - col[b]) + abs(row[a] - row[b])
+
+    def calc_key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (m + self.h(self.start, u) + self.km, m)
+
+    def reset(self, start, goals):
+        n = self.grid.size
+        self.g = cell_values(n, INF)
+        self.rhs = cell_values(n, INF)
+        self.key = cell_values(n, None)
+        self.open_set = []
+        self.km = 0
+        self.start = self.last = start
+        self.goals = set(goals)
+        self.version = self.board.version
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self.push(goal)
+        self.resets += 1
+
+    def push(self, u):
+        k = self.calc_key(u)
+        self.key[u] = k
+        heapq.heappush(self.open_set, (k[0], k[1], u))
+
+    def update_vertex(self, u):
+        g, rhs = self.g, self.rhs
+        if u not in self.goals:
+            best = INF
+            is_blocked = self.board.is_blocked
+            for s in self.grid.neighbours[u]:
+                if g[s] + 1 < best and not is_blocked(s):
+                    best = g[s] + 1
+            rhs[u] = best
+        if g[u] != rhs[u]:
+            self.push(u)
+        else:
+            self.key[u] = None
+
+    def compute_shortest_path(self):
+        # False if the budget ran out before the walker's cell was settled
+        g, rhs, key, open_set = self.g, self.rhs, self.key, self.open_set
+        neighbours = self.grid.neighbours
+        start = self.start
+        budget = INF if self.budget is None else self.budget
+        while open_set:
+            k1, k2, u = open_set[0]
+            if key[u] != (k1, k2):
+                # Stale entry left behind by a later push
+                heapq.heappop(open_set)
+                continue
+            if (k1, k2) >= self.calc_key(start) and rhs[start] == g[start]:
+                break
+            if budget <= 0:
+                return False
+            budget -= 1
+            heapq.heappop(open_set)
+            self.expanded += 1
+            k_new = self.calc_key(u)
+            if (k1, k2) < k_new:
+                self.push(u)
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                key[u] = None
+                for s in neighbours[u]:
+                    self.update_vertex(s)
+            else:
+                g[u] = INF
+                self.update_vertex(u)
+                for s in neighbours[u]:
+                    self.update_vertex(s)
+        return True
+
+    def next_step(self, start, goals):
+        """(next cell, goal it leads to) on a shortest path to the nearest reachable goal.
+
+        Returns (None, None) when none of the goals can be reached, or
+        while a budgeted search is still on its way to start.
+        """
+        goals = set(goals)
+        changes = self.board.changed_since(self.version)
+        if changes is None or not goals or not goals <= self.goals:
+            self.reset(start, goals)
+        else:
+            if start != self.start:
+                self.km += self.h(self.last, start)
+                self.last = self.start = start
+            # A cell flipping between free and blocked changes the cost of
+            # stepping into it, which only matters to its neighbours
+            touched = set(changes)
+            for v in touched:
+                for s in self.grid.neighbours[v]:
+                    self.update_vertex(s)
+            # Copies eaten by somebody else stop being goals
+            gone = self.goals - goals
+            self.goals = goals
+            for v in gone:
+                self.update_vertex(v)
+            self.version = self.board.version
+        finished = self.compute_shortest_path()
+
+        distance = self.rhs[start]
+        if not finished or distance == INF or self.g[start] != distance:
+            return None, None
+        nxt = self.descend(start)
+        goal = nxt
+        # Follow the tree down to see which copy we are heading for, distance steps at most
+        for _ in range(distance - 1):
+            if goal is None or goal in self.goals:
+                break
+            goal = self.descend(goal)
+        if goal not in self.goals:
+            return None, None
+        return nxt, goal
+
+    def descend(self, u):
+        g = self.g
+        best, best_cost = None, INF
+        is_blocked = self.board.is_blocked
+        for s in self.grid.neighbours[u]:
+            if g[s] + 1 < best_cost and not is_blocked(s):
+                best, best_cost = s, g[s] + 1
+        return best
+
+    def plan(self, start, goals):
+        # Pixel-position wrapper around next_step() for the game code
+        grid = self.grid
+        nxt, goal = self.next_step(grid.index(start), [grid.index(p) for p in goals])
+        if nxt is None:
+            return None, None
+        return grid.position(nxt), grid.position(goal)
+
+
+class DistanceField:
+    """BFS distances from a set of source cells (the snake heads), shared by every hunter.
+
+    The field is worked out at most once per board version, however many
+    eagles read it, and each eagle steps by comparing its neighbours'
+    distances. mask is a 256-entry table saying which board owners can't be
+    crossed, read straight off board.cells so no per-tick map is built.
+    """
+
+    def __init__(self, board, grid, mask):
+        self.board = board
+        self.grid = grid
+        self.mask = mask
+        n = grid.size
+        self.dist = cell_values(n, 0)
+        self.seen = cell_values(n, 0)
+        self.stamp = 0
+        self.key = None
+        self.complete = True
+        # How many times the BFS actually ran, to check the cache is doing its job
+        self.builds = 0
+
+    def distance(self, i):
+        return self.dist[i] if self.seen[i] == self.stamp else INF
+
+    def update(self, sources, targets=(), limit=None):
+        """Make sure distances are known for every target cell.
+
+        The BFS stops as soon as the last target is labelled: by then every
+        cell closer to a source is labelled as well, which is all step() needs.
+        With a limit it also stops limit steps out, and targets further away
+        than that stay unlabelled (step() leaves them where they are).
+        """
+        key = (self.board.version, tuple(sources))
+        if key == self.key and (self.complete or all(self.seen[t] == self.stamp for t in targets)):
+            return
+        self.key = key
+        self.builds += 1
+        self.stamp += 1
+        stamp, dist, seen = self.stamp, self.dist, self.seen
+        neighbours, cells, mask = self.grid.neighbours, self.board.cells, self.mask
+        waiting = set(targets)
+        frontier = []
+        for s in sources:
+            if seen[s] != stamp:
+                seen[s] = stamp
+                dist[s] = 0
+                frontier.append(s)
+                waiting.discard(s)
+        d = 0
+        self.complete = False
+        while frontier and (waiting or not targets) and (limit is None or d < limit):
+            d += 1
+            next_frontier = []
+            for u in frontier:
+                for v in neighbours[u]:
+                    if seen[v] != stamp and not mask[cells[v]]:
+                        seen[v] = stamp
+                        dist[v] = d
+                        next_frontier.append(v)
+                        waiting.discard(v)
+            frontier = next_frontier
+        self.complete = not frontier
+
+    def step(self, i):
+        # Neighbour closest to a source, or None if i is stuck or unreachable
+        best, best_dist = None, self.distance(i)
+        cells, mask = self.board.cells, self.mask
+        for v in self.grid.neighbours[i]:
+            d = self.distance(v)
+            if d < best_dist and not mask[cells[v]]:
+                best, best_dist = v, d
+        return best
+
+
+class CooperativePlanner:
+    """Windowed cooperative A* (WHCA*) for a team of snakes after the same letters.
+
+    plan() takes the whole team at once. One BFS out from the goals gives
+    every snake the same true-distance heuristic, then each snake in turn
+    (nearest to a goal first) searches `window` ticks ahead in space and
+    time, keeping clear of the cells the snakes before it have reserved. A
+    snake's body trails its head, so a cell its head passes at tick t stays
+    reserved until t + its length. Only the first step of each plan is
+    taken and the team is planned again next tick, so the work per tick is
+    the BFS plus a small search per snake. With a limit the BFS stops that
+    many steps out and snakes further away go by Manhattan distance.
+    """
+
+    def __init__(self, board, grid, mask, window=8, limit=None):
+        self.board = board
+        self.grid = grid
+        self.mask = mask
+        self.window = window
+        self.limit = limit
+        self.field = DistanceField(board, grid, mask)
+        # Search nodes popped and time spent in plan(), so callers can check the per-snake work stays small
+        self.expanded = 0
+        self.plans = 0
+        self.planning = 0.0
+
+    def plan(self, agents, goals, others=()):
+        """Next position for every snake in agents (None: no safe way forward), heading for the goals.
+
+        agents and others are head-first position sequences; others (the
+        human snakes) are in the way but reserve nothing ahead.
+        """
+        started = time.perf_counter()
+        grid = self.grid
+        goal_cells = {grid.index(p) for p in goals}
+        heads = [grid.index(next(iter(body))) for body in agents]
+        self.field.update(list(goal_cells), heads, self.limit)
+        # When each snake cell frees up: a tail leaves after a tick, the cell before it after two...
+        free_at = {}
+        for body in list(agents) + [b for b in others if b]:
+            length = len(body)
+            for i, pos in enumerate(body):
+                c = grid.index(pos)
+                free_at[c] = max(free_at.get(c, 0), length - i + 1)
+        reserved = set()
+        moves = [None] * len(agents)
+        order = sorted(range(len(agents)), key=lambda k: (self.field.distance(heads[k]), k))
+        for k in order:
+            path = self.search(heads[k], goal_cells, free_at, reserved)
+            if not path:
+                continue
+            moves[k] = grid.position(path[0])
+            # The body follows the head along the path
+            length = len(agents[k])
+            for t, c in enumerate(path, 1):
+                for u in range(t, min(self.window, t + length) + 1):
+                    reserved.add((c, u))
+            # A snake that stops at a goal within the window sits there for the rest of it
+            for u in range(len(path) + 1, self.window + 1):
+                reserved.add((path[-1], u))
+        self.plans += 1
+        self.planning += time.perf_counter() - started
+        return moves
+
+    def passable(self, c, t, free_at, reserved):
+        cells = self.board.cells
+        if self.mask[cells[c]] or c in self.board.eagles or (c, t) in reserved:
+            return False
+        return not cells[c] or t >= free_at.get(c, INF)
+
+    def search(self, start, goals, free_at, reserved):
+        """Cells for ticks 1, 2, ... up to a goal or the end of the window, [] if the snake is boxed in."""
+        neighbours, window, field = self.grid.neighbours, self.window, self.field
+        col, row = self.grid.col, self.grid.row
+
+        def h(c):
+            d = field.distance(c)
+            if d == INF:
+                # Beyond the BFS, or cut off from every goal
+                d = min(abs(col[c] - col[g]) + abs(row[c] - row[g]) for g in goals)
+            return d
+        # Equal f goes to the deeper node first
+        open_set = [(h(start), 0, start)]
+        parent = {(start, 0): None}
+        while open_set:
+            f, t, c = heapq.heappop(open_set)
+            t = -t
+            self.expanded += 1
+            if t == window or (t and c in goals):
+                path = []
+                node = (c, t)
+                while node[1]:
+                    path.append(node[0])
+                    node = parent[node]
+                return path[::-1]
+            for v in neighbours[c]:
+                state = (v, t + 1)
+                if state not in parent and self.passable(v, t + 1, free_at, reserved):
+                    parent[state] = (c, t)
+                    heapq.heappush(open_set, (t + 1 + h(v), -(t + 1), v))
+        return []
+
+
+if __name__ == "__main__":
+    # python pathfinding.py [ticks]: how planning time per tick grows with the
+    # size of the AI team, for teams of 1, 8 and 64 snakes
+    import random
+    import sys
+    from game_state import GameState, step, PLAYER, GRID_SIZE
+
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    moves = [(0, -GRID_SIZE), (0, GRID_SIZE), (-GRID_SIZE, 0), (GRID_SIZE, 0)]
+
+    def wander(state, rng):
+        # Player 1 keeps going, turning at random or when about to hit something
+        head, d = state.snake.head, state.direction
+        safe = [m for m in moves if m != (-d[0], -d[1]) and not state.board.blocked((head[0] + m[0], head[1] + m[1]))]
+        if d in safe and rng.random() < 0.9:
+            return None
+        return rng.choice(safe) if safe else None
+
+    print(f"{'snakes':>6} {'ms/tick':>8} {'p95':>7} {'us/snake':>9} {'nodes/snake':>12} {'lost':>5}")
+    for count in (1, 8, 64):
+        planning, expanded, lost, seed = [], 0, 0, 0
+        while len(planning) < ticks:
+            state = GameState("vs_ai", seed=seed, board_size=(160, 90), ai_count=count, cooperative=True)
+            planner = state.ai_planner
+            rng = random.Random(seed)
+            while state.running and len(planning) < ticks:
+                before, snakes = planner.planning, len(state.ai_snakes)
+                step(state, {PLAYER: wander(state, rng)})
+                if planner.planning != before:
+                    planning.append((planner.planning - before, snakes))
+                lost += sum(1 for e in state.events if e[0] == "ai_lost")
+            expanded += planner.expanded
+            seed += 1
+        per_tick = sorted(t for t, n in planning)
+        per_snake = sum(t for t, n in planning) / sum(n for t, n in planning)
+        print(f"{count:6} {sum(per_tick) / len(per_tick) * 1000:8.2f} {per_tick[len(per_tick) * 95 // 100] * 1000:7.2f} "
+              f"{per_snake * 1e6:9.1f} {expanded / sum(n for t, n in planning):12.1f} {lost:5}")
@@ -0,0 +1,172 @@
+import csv
+import queue
+import threading
+import time
+from collections import deque
+
+# Where a frame's time goes: named spans around each phase of a frame
+# (input, the moves inside a tick, drawing, display flip), rolling
+# percentiles per phase for the on-screen overlay, and optionally every
+# frame's timings streamed to a CSV file by a background thread.
+#
+# Disabled (the default) span() hands back one shared do-nothing context,
+# so the instrumented code pays a method call and nothing else.
+
+# Column order of the CSV and the overlay; other span names show up after them
+PHASES = ["input", "player", "player2", "ai", "eagles", "draw", "flip"]
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class Span:
+    """One timed phase; time spent in spans nested inside it is counted to those, not to this one."""
+
+    __slots__ = ("profiler", "name", "start", "inner")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.inner = 0.0
+        self.profiler.stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        p = self.profiler
+        p.stack.pop()
+        if p.stack:
+            p.stack[-1].inner += elapsed
+        p.frame[self.name] = p.frame.get(self.name, 0.0) + elapsed - self.inner
+        return False
+
+
+class CSVWriter:
+    """Writes rows to a CSV file from its own thread so the game loop never waits on the disk."""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.rows = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, args=(header,), name="profile-csv", daemon=True)
+        self.thread.start()
+
+    def run(self, header):
+        with open(self.path, "w", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(header)
+            while True:
+                row = self.rows.get()
+                if row is None:
+                    return
+                out.writerow(row)
+                # Only flush once the queue has been drained
+                if self.rows.empty():
+                    f.flush()
+
+    def write(self, row):
+        self.rows.put(row)
+
+    def close(self):
+        self.rows.put(None)
+        self.thread.join()
+
+
+class FrameProfiler:
+    """Per-phase frame timings.
+
+    Wrap each phase in `with profiler.span(name):` and call end_frame()
+    once per frame. stats() gives p50/p95/p99 in ms over the last `window`
+    frames each phase ran in.
+    """
+
+    def __init__(self, enabled=False, window=240):
+        self.enabled = enabled
+        self.overlay = False
+        self.window = window
+        self.history = {}
+        self.phases = list(PHASES)
+        self.columns = None
+        self.stack = []
+        self.frame = {}
+        self.ticks = 0
+        self.frames = 0
+        self.last_frame = None
+        self.writer = None
+
+    def span(self, name):
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name)
+
+    def set_overlay(self, shown):
+        self.overlay = shown
+        self.enabled = shown or self.writer is not None
+
+    def write_csv(self, path):
+        # Columns are fixed when the file is started
+        self.columns = ["frame"] + self.phases
+        self.writer = CSVWriter(path, ["frame_no", "ticks"] + [f"{name}_ms" for name in self.columns])
+        self.enabled = True
+
+    def reset(self):
+        # Forget the frame in progress, e.g. after a pause that shouldn't count as one long frame
+        self.frame = {}
+        self.ticks = 0
+        self.last_frame = None
+
+    def tick(self):
+        if self.enabled:
+            self.ticks += 1
+
+    def end_frame(self):
+        if not self.enabled:
+            self.last_frame = None
+            return
+        now = time.perf_counter()
+        frame, self.frame = self.frame, {}
+        if self.last_frame is not None:
+            frame["frame"] = now - self.last_frame
+        self.last_frame = now
+        for name, seconds in frame.items():
+            history = self.history.get(name)
+            if history is None:
+                history = self.history[name] = deque(maxlen=self.window)
+                if name not in self.phases and name != "frame":
+                    self.phases.append(name)
+            history.append(seconds * 1000)
+        if self.writer:
+            row = [self.frames, self.ticks] + [round(frame[name] * 1000, 3) if name in frame else ""
+                                               for name in self.columns]
+            self.writer.write(row)
+        self.frames += 1
+        self.ticks = 0
+
+    def stats(self):
+        # {phase: (p50, p95, p99)} in ms, frame time first
+        result = {}
+        for name in ["frame"] + self.phases:
+            history = self.history.get(name)
+            if history:
+                ms = sorted(history)
+                result[name] = tuple(ms[min(len(ms) - 1, len(ms) * p // 100)] for p in (50, 95, 99))
+        return result
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+            self.enabled = self.overlay
+
+
+frame_profiler = FrameProfiler()
@@ -0,0 +1,116 @@
+import struct
+import sys
+import time
+
+from dictionary import valid_words
+from game_state import GameState, step, state_hash, GRID_SIZE, PLAYER, PLAYER2
+
+# Input logs: the seed and settings of a game plus one byte per tick holding
+# both players' turn requests, enough to replay the game exactly.
+#
+#   python replay.py game.wsr [more.wsr ...]
+#
+# re-runs each log headless as fast as it goes and checks the final state
+# hash against the one recorded when the game was played.
+
+REPLAY_MAGIC = b"WSREPLY3"
+# magic, seed, word-list size, extra eagles, board columns and rows (0 = the window-sized board),
+# AI snakes, mode length
+REPLAY_HEADER = struct.Struct("<8sQIHIIHB")
+# Older logs still load: v1 has no board size, v2 no AI snake count
+OLD_HEADERS = {
+    b"WSREPLY1": struct.Struct("<8sQIHB"),
+    b"WSREPLY2": struct.Struct("<8sQIHIIB"),
+}
+
+# 0 = keep going, 1-4 = turn that way; player 1 in the low nibble, player 2 in the high one
+DIRECTIONS = [None, (0, -GRID_SIZE), (0, GRID_SIZE), (-GRID_SIZE, 0), (GRID_SIZE, 0)]
+DIRECTION_CODES = {d: code for code, d in enumerate(DIRECTIONS)}
+
+
+def encode_actions(actions):
+    return DIRECTION_CODES[actions.get(PLAYER)] | DIRECTION_CODES[actions.get(PLAYER2)] << 4
+
+
+def decode_actions(code):
+    return {PLAYER: DIRECTIONS[code & 0x0F], PLAYER2: DIRECTIONS[code >> 4]}
+
+
+class ReplayLog:
+    """The inputs of one game, written while it is played or loaded from a file."""
+
+    def __init__(self, seed, mode, extra_eagles=0, words=None, board_size=None, ai_count=1):
+        self.seed = seed
+        self.mode = mode
+        self.extra_eagles = extra_eagles
+        self.board_size = board_size
+        self.ai_count = ai_count
+        # Replays only match against the same dictionary
+        self.words = len(valid_words) if words is None else words
+        self.inputs = bytearray()
+        self.final_hash = None
+
+    @classmethod
+    def for_game(cls, state):
+        return cls(state.seed, state.mode, state.extra_eagles, board_size=state.board_size, ai_count=state.ai_count)
+
+    def record(self, actions):
+        self.inputs.append(encode_actions(actions))
+
+    def finish(self, state):
+        self.final_hash = state_hash(state)
+
+    def save(self, path):
+        mode = self.mode.encode()
+        with open(path, "wb") as f:
+            cols, rows = self.board_size or (0, 0)
+            f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, self.seed, self.words, self.extra_eagles, cols, rows,
+                                       self.ai_count, len(mode)))
+            f.write(mode)
+            f.write(struct.pack("<I", len(self.inputs)))
+            f.write(self.inputs)
+            f.write(self.final_hash or bytes(16))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        header = REPLAY_HEADER if data[:8] == REPLAY_MAGIC else OLD_HEADERS.get(data[:8])
+        if header is None:
+            raise ValueError(f"{path} is not a replay log")
+        fields = header.unpack_from(data)
+        seed, words, extra_eagles, mode_len = fields[1], fields[2], fields[3], fields[-1]
+        cols, rows = fields[4:6] if len(fields) > 5 else (0, 0)
+        ai_count = fields[6] if len(fields) > 7 else 1
+        pos = header.size
+        log = cls(seed, data[pos:pos + mode_len].decode(), extra_eagles, words, (cols, rows) if cols else None, ai_count)
+        pos += mode_len
+        ticks = struct.unpack_from("<I", data, pos)[0]
+        pos += 4
+        log.inputs = bytearray(data[pos:pos + ticks])
+        log.final_hash = data[pos + ticks:pos + ticks + 16]
+        return log
+
+
+def run(log):
+    """Replay log headless; returns the final state."""
+    if log.words != len(valid_words):
+        raise ValueError(f"replay was recorded with a {log.words}-word dictionary, this one has {len(valid_words)}")
+    state = GameState(log.mode, log.extra_eagles, seed=log.seed, board_size=log.board_size, ai_count=log.ai_count)
+    for code in log.inputs:
+        step(state, decode_actions(code))
+    return state
+
+
+if __name__ == "__main__":
+    failed = 0
+    for path in sys.argv[1:]:
+        log = ReplayLog.load(path)
+        t = time.perf_counter()
+        state = run(log)
+        elapsed = time.perf_counter() - t
+        ok = state_hash(state) == log.final_hash
+        failed += not ok
+        print(f"{path}: {len(log.inputs)} ticks in {elapsed * 1000:.1f} ms "
+              f"({len(log.inputs) / max(elapsed, 1e-9):.0f} ticks/s) {'OK' if ok else 'MISMATCH'}")
+    sys.exit(1 if failed else 0)
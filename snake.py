@@ -0,0 +1,64 @@
+from collections import deque
+
+
+class Snake:
+    """A snake body: a deque of positions head-first plus a count of every cell it covers.
+
+    Moving, growing and "is this cell part of me?" are all O(1), no matter how
+    long the snake gets. The counts make it a multiset, so a cell stays marked
+    while any segment is still on it.
+    """
+
+    __slots__ = ("body", "cells")
+
+    def __init__(self, positions=()):
+        self.body = deque()
+        self.cells = {}
+        for pos in positions:
+            self.push_tail(pos)
+
+    @property
+    def head(self):
+        return self.body[0]
+
+    @property
+    def tail(self):
+        return self.body[-1]
+
+    def push_head(self, pos):
+        self.body.appendleft(pos)
+        self.cells[pos] = self.cells.get(pos, 0) + 1
+
+    def push_tail(self, pos):
+        self.body.append(pos)
+        self.cells[pos] = self.cells.get(pos, 0) + 1
+
+    def pop_tail(self):
+        pos = self.body.pop()
+        count = self.cells[pos] - 1
+        if count:
+            self.cells[pos] = count
+        else:
+            del self.cells[pos]
+        return pos
+
+    def grow(self, pos):
+        # New head, tail stays where it is
+        self.push_head(pos)
+
+    def move(self, pos):
+        # New head, tail follows; returns the cell the tail left
+        self.push_head(pos)
+        return self.pop_tail()
+
+    def __contains__(self, pos):
+        return pos in self.cells
+
+    def __len__(self):
+        return len(self.body)
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def __repr__(self):
+        return f"Snake({list(self.body)!r})"
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from board import Board, FreeCells, AI_CELL, WATER_CELL
+
+GRID_SIZE = 20
+
+
+def check_index(free, expected):
+    # Same cells as a plain set, and every cell's slot pointing back at it
+    assert sorted(free.cells) == sorted(expected)
+    for k, i in enumerate(free.cells):
+        assert free.slot[i] == k
+    for i in range(len(free.slot)):
+        if i not in expected:
+            assert free.slot[i] == -1
+
+
+def test_free_cells_follow_holds_and_releases():
+    rng = random.Random(14)
+    size = 200
+    region = [i for i in range(size) if i % 10 != 0]
+    free = FreeCells(size, region)
+    holds = [0] * size
+    for _ in range(3000):
+        i = rng.randrange(size)
+        if holds[i] and rng.random() < 0.5:
+            free.unhold(i)
+            holds[i] -= 1
+        else:
+            free.hold(i)
+            holds[i] += 1
+        assert free.is_free(i) == (holds[i] == 0)
+    check_index(free, {i for i in region if not holds[i]})
+
+
+def test_sample_draws_distinct_free_cells():
+    rng = random.Random(3)
+    free = FreeCells(100, range(100))
+    for i in range(0, 100, 3):
+        free.hold(i)
+    for _ in range(50):
+        cells = list(free.sample(20, rng))
+        assert len(set(cells)) == 20
+        assert all(free.is_free(i) and i % 3 for i in cells)
+    # Sampling only shuffles, the index itself is unchanged
+    check_index(free, {i for i in range(100) if i % 3})
+    with pytest.raises(ValueError):
+        free.sample(len(free) + 1, rng)
+
+
+def test_board_keeps_free_index_in_step():
+    board = Board(200, 140, GRID_SIZE)
+    n = board.cols * board.rows
+    board.fill([(0, 0), (20, 0), (40, 0)], AI_CELL)
+    board.set_obstacles([(60, 60, "water"), (80, 80, "eagle")])
+    taken = {board.index(p) for p in [(0, 0), (20, 0), (40, 0), (60, 60)]}
+    check_index(board.free, set(range(n)) - taken)
+    board.release((20, 0))
+    board.set_obstacles([])
+    check_index(board.free, set(range(n)) - {board.index((0, 0)), board.index((40, 0))})
+    assert board.cells[board.index((60, 60))] != WATER_CELL
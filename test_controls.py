@@ -0,0 +1,58 @@
+from controls import DirectionQueue, MAX_QUEUED
+
+UP, DOWN, LEFT, RIGHT = (0, -20), (0, 20), (-20, 0), (20, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_quick_turns_are_applied_one_per_tick():
+    queue = DirectionQueue(clock=FakeClock())
+    # Up then left between two ticks becomes two moves
+    assert queue.push(UP, RIGHT)
+    assert queue.push(LEFT, RIGHT)
+    assert queue.pop(RIGHT) == UP
+    assert queue.pop(UP) == LEFT
+    assert queue.pop(LEFT) is None
+
+
+def test_reversals_and_repeats_are_not_queued():
+    queue = DirectionQueue(clock=FakeClock())
+    assert not queue.push(LEFT, RIGHT)
+    assert not queue.push(RIGHT, RIGHT)
+    assert queue.push(UP, RIGHT)
+    # Checked against the last queued turn, not the current heading
+    assert not queue.push(DOWN, RIGHT)
+    assert not queue.push(UP, RIGHT)
+    assert queue.push(LEFT, RIGHT)
+
+
+def test_full_queue_drops_turns():
+    queue = DirectionQueue(clock=FakeClock())
+    turns = [UP, LEFT, DOWN, RIGHT]
+    assert [queue.push(d, RIGHT) for d in turns] == [True] * MAX_QUEUED + [False]
+    assert queue.dropped == 1
+    assert [queue.pop(None) for _ in turns] == turns[:MAX_QUEUED] + [None]
+
+
+def test_turns_made_stale_by_a_respawn_are_skipped():
+    queue = DirectionQueue(clock=FakeClock())
+    queue.push(UP, RIGHT)
+    queue.push(LEFT, RIGHT)
+    # The snake now heads down: up would reverse it, left still works
+    assert queue.pop(DOWN) == LEFT
+
+
+def test_latency_is_measured_from_keydown_to_tick():
+    clock = FakeClock()
+    queue = DirectionQueue(clock=clock)
+    queue.push(UP, RIGHT)
+    clock.now = 0.1
+    queue.pop(RIGHT)
+    assert list(queue.latencies) == [0.1]
+    assert "1 turns" in queue.latency_report("Player 1")
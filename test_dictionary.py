@@ -0,0 +1,61 @@
+import random
+import string
+
+from dictionary import WordList, PrefixTrie, build, DEAD, ROOT
+
+WORDS = ["cat", "Car", "cart", "dog", "do", "zebra", "apple", "app", "a"]
+
+
+def random_words(rng, k):
+    return {"".join(rng.choice(string.ascii_lowercase[:6]) for _ in range(rng.randint(1, 7))) for _ in range(k)}
+
+
+def test_word_list_round_trip(tmp_path):
+    path = tmp_path / "words.dat"
+    assert build(WORDS + ["cat", " dog "], path, tmp_path / "words.trie") == len(WORDS)
+    words = WordList(path)
+    assert len(words) == len(WORDS)
+    for word in WORDS:
+        assert word in words
+        assert word.upper() in words
+    for word in ["", "ca", "carts", "zebr", "b", "zz"]:
+        assert word not in words
+
+
+def test_word_list_lookups_match_a_set(tmp_path):
+    rng = random.Random(16)
+    stored = random_words(rng, 500)
+    path = tmp_path / "words.dat"
+    build(stored, path, tmp_path / "words.trie")
+    words = WordList(path)
+    for word in stored | random_words(rng, 500):
+        assert (word in words) == (word in stored)
+
+
+def test_missing_word_list_is_empty(tmp_path):
+    words = WordList(tmp_path / "nothing.dat")
+    assert len(words) == 0
+    assert "cat" not in words
+
+
+def test_trie_file_matches_from_words(tmp_path):
+    rng = random.Random(17)
+    stored = random_words(rng, 400)
+    build(stored, tmp_path / "words.dat", tmp_path / "words.trie")
+    tries = [PrefixTrie(tmp_path / "words.trie"), PrefixTrie.from_words(stored)]
+    prefixes = {word[:k] for word in stored for k in range(len(word) + 1)}
+    for word in prefixes | random_words(rng, 400):
+        for trie in tries:
+            node = trie.follow(word.upper())
+            assert (node != DEAD) == (word in prefixes)
+            assert trie.is_word(node) == (word in stored)
+
+
+def test_trie_next_letters():
+    trie = PrefixTrie.from_words(WORDS)
+    assert trie.next_letters(ROOT) == "ACDZ"
+    assert trie.next_letters(trie.follow("ca")) == "RT"
+    assert trie.next_letters(trie.follow("cat")) == ""
+    assert trie.next_letters(DEAD) == ""
+    assert trie.step(trie.follow("c"), "x") == DEAD
+    assert trie.step(DEAD, "a") == DEAD
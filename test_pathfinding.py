@@ -0,0 +1,128 @@
+import random
+from collections import deque
+
+from board import Board, AI_CELL, WATER_CELL, OBSTACLES_ONLY
+from pathfinding import GridPathfinder, IncrementalPlanner, CooperativePlanner, INF
+from snake import Snake
+
+GRID_SIZE = 20
+
+
+def bfs_distance(board, grid, start, goals):
+    # Fresh multi-source BFS from the goals, the answer D* Lite has to keep matching.
+    # The start is the walker's own head, so whatever is on it doesn't count;
+    # a goal under an eagle can't be stepped onto.
+    dist = {g: 0 for g in goals if not board.is_blocked(g)}
+    queue = deque(dist)
+    while queue:
+        u = queue.popleft()
+        if u == start:
+            return dist[u]
+        for v in grid.neighbours[u]:
+            if v not in dist and (v == start or not board.is_blocked(v)):
+                dist[v] = dist[u] + 1
+                queue.append(v)
+    return INF
+
+
+def random_walk(rng, sizes, trials, budget=None):
+    """Walk a planner around boards whose cells flip every tick.
+
+    Checks every step against a fresh BFS and returns how many times the
+    walker moved and how many times it was left waiting on the budget.
+    """
+    moves = waits = 0
+    for trial in range(trials):
+        board = Board(*rng.choice(sizes), GRID_SIZE)
+        grid = GridPathfinder(board.cols, board.rows, GRID_SIZE)
+        planner = IncrementalPlanner(board, grid, budget)
+        n = grid.size
+        for i in range(n):
+            if rng.random() < 0.2:
+                board.set_cell(i, WATER_CELL)
+        start = rng.randrange(n)
+        goals = set(rng.sample(range(n), 3)) - {start}
+        for i in [start, *goals]:
+            board.set_cell(i, 0)
+        for tick in range(150):
+            expanded = planner.expanded
+            nxt, goal = planner.next_step(start, goals)
+            expected = bfs_distance(board, grid, start, goals)
+            if budget is None:
+                assert planner.rhs[start] == expected, (trial, tick)
+            else:
+                assert planner.expanded - expanded <= budget
+            if nxt is None:
+                if expected != INF:
+                    assert budget is not None, (trial, tick)
+                    waits += 1
+            else:
+                # Whatever the budget, a step taken is the first step of a shortest path
+                assert not board.is_blocked(nxt)
+                assert goal in goals
+                assert bfs_distance(board, grid, nxt, goals) == expected - 1, (trial, tick)
+                moves += 1
+                start = nxt
+                # Eating a copy removes it; the last one brings a new goal set
+                goals.discard(start)
+                if not goals:
+                    goals = {i for i in rng.sample(range(n), 3) if i != start}
+                    for i in goals:
+                        board.set_cell(i, 0)
+            # Snakes and obstacles coming and going around the walker
+            for _ in range(rng.randint(0, 4)):
+                i = rng.randrange(n)
+                if i != start and i not in goals:
+                    board.set_cell(i, 0 if board.cells[i] else AI_CELL)
+            if rng.random() < 0.05:
+                board.set_eagles([board.position(rng.randrange(n))])
+    return moves, waits
+
+
+def test_next_step_matches_bfs_under_random_flips():
+    random_walk(random.Random(5), [(200, 200), (400, 400), (600, 200)], 12)
+
+
+def test_budgeted_search_only_steps_once_settled():
+    # Small budgets leave searches unfinished most ticks, big ones only after a new goal set
+    for budget in (20, 100, 500):
+        moves, waits = random_walk(random.Random(budget), [(1200, 1200), (2000, 1500)], 4, budget)
+        assert moves > 0 and waits > 0, budget
+
+
+def test_cooperative_team_never_runs_into_itself():
+    rng = random.Random(25)
+    board = Board(600, 400, GRID_SIZE)
+    grid = GridPathfinder(board.cols, board.rows, GRID_SIZE)
+    planner = CooperativePlanner(board, grid, OBSTACLES_ONLY)
+    for i in range(grid.size):
+        if rng.random() < 0.1:
+            board.set_cell(i, WATER_CELL)
+
+    def free_position():
+        return board.position(rng.choice([i for i in range(grid.size) if not board.cells[i]]))
+
+    snakes = []
+    for _ in range(12):
+        snakes.append(Snake([free_position()]))
+        board.fill(snakes[-1], AI_CELL)
+    goals = {free_position() for _ in range(4)}
+    eaten = 0
+    for tick in range(300):
+        moves = planner.plan(snakes, goals)
+        # Moved one after another, like the game does
+        for snake, pos in zip(snakes, moves):
+            if pos is None:
+                continue
+            head = snake.head
+            assert abs(pos[0] - head[0]) + abs(pos[1] - head[1]) == GRID_SIZE
+            assert not board.blocked(pos), tick
+            board.occupy(pos, AI_CELL)
+            if pos in goals:
+                snake.grow(pos)
+                goals.remove(pos)
+                goals.add(free_position())
+                eaten += 1
+            else:
+                board.release(snake.move(pos))
+    assert eaten > 20
@@ -0,0 +1,43 @@
+import random
+
+from game_state import GameState, step, state_hash, PLAYER, PLAYER2, FREE_FORM
+from replay import ReplayLog, run, DIRECTIONS, OLD_HEADERS, encode_actions, decode_actions
+
+
+def test_replay_round_trip(tmp_path):
+    for seed, mode in enumerate(["vs_ai", "vs_ai_human2", FREE_FORM]):
+        state = GameState(mode, extra_eagles=seed % 2, seed=1000 + seed)
+        log = ReplayLog.for_game(state)
+        rng = random.Random(seed)
+        while state.running and state.tick < 1500:
+            actions = {PLAYER: rng.choice(DIRECTIONS) if rng.random() < 0.3 else None}
+            if state.snake2:
+                actions[PLAYER2] = rng.choice(DIRECTIONS) if rng.random() < 0.3 else None
+            log.record(actions)
+            step(state, actions)
+        log.finish(state)
+        path = tmp_path / f"{mode}.wsr"
+        log.save(path)
+
+        loaded = ReplayLog.load(path)
+        assert loaded.inputs == log.inputs
+        assert state_hash(run(loaded)) == loaded.final_hash
+
+
+def test_actions_fit_one_byte():
+    for one in DIRECTIONS:
+        for two in DIRECTIONS:
+            code = encode_actions({PLAYER: one, PLAYER2: two})
+            assert 0 <= code < 256
+            assert decode_actions(code) == {PLAYER: one, PLAYER2: two}
+
+
+def test_old_logs_still_load(tmp_path):
+    for magic, header in OLD_HEADERS.items():
+        fields = [magic, 42, 7, 1] + [0] * (len(header.unpack(bytes(header.size))) - 5) + [len(b"vs_ai")]
+        path = tmp_path / "old.wsr"
+        path.write_bytes(header.pack(*fields) + b"vs_ai" + (3).to_bytes(4, "little") + bytes([1, 2, 3]) + bytes(16))
+        log = ReplayLog.load(path)
+        assert (log.seed, log.words, log.extra_eagles, log.mode) == (42, 7, 1, "vs_ai")
+        assert (log.board_size, log.ai_count) == (None, 1)
+        assert log.inputs == bytearray([1, 2, 3])
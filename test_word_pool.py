@@ -0,0 +1,45 @@
+import random
+
+from dictionary import WordList, build
+from word_pool import WordPool, TIERS, word_tier
+
+
+def make_pool(tmp_path, words):
+    build(words, tmp_path / "words.dat", tmp_path / "words.trie")
+    return WordPool(WordList(tmp_path / "words.dat"), path=tmp_path / "words.pool")
+
+
+def test_tiers_are_cached_until_the_word_list_changes(tmp_path):
+    words = ["cat", "dog", "quiz", "house", "jazzy", "elephant", "a", "toolongword"]
+    pool = make_pool(tmp_path, words)
+    sizes = pool.sizes()
+    assert sum(sizes) == sum(word_tier(w) is not None for w in words)
+    assert (tmp_path / "words.pool").exists()
+
+    # A fresh pool reads the cache instead of building it again
+    again = WordPool(WordList(tmp_path / "words.dat"), path=tmp_path / "words.pool")
+    assert again.read() is not None
+    assert again.sizes() == sizes
+
+    # Rebuilding words.dat makes the cache stale
+    changed = make_pool(tmp_path, words + ["zebra", "fox", "tiger"])
+    assert changed.read() is None
+    assert sum(changed.sizes()) == sum(sizes) + 3
+    assert changed.read() is not None
+
+
+def test_samples_come_from_the_tier_or_an_easier_one(tmp_path):
+    words = ["cat", "dog", "sun", "quiz", "house", "jazzy"]
+    pool = make_pool(tmp_path, words)
+    rng = random.Random(18)
+    for tier in range(TIERS + 2):
+        for _ in range(20):
+            word = pool.sample(tier, rng)
+            assert word in words
+            assert word_tier(word) <= tier
+
+
+def test_fallback_words_without_a_dictionary(tmp_path):
+    pool = WordPool(WordList(tmp_path / "nothing.dat"), fallback={"cat", "four", "x"}, path=tmp_path / "words.pool")
+    assert sum(pool.sizes()) == 2
+    assert pool.sample(TIERS - 1, random.Random(0)) in {"cat", "four"}
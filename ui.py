@@ -0,0 +1,400 @@
+import math
+import random
+import time
+from collections import OrderedDict
+import numpy as np
+import pygame
+
+# Menu gradient: deep indigo -> vibrant purple -> soft sky blue, with a gentle sine wave
+TOP_COLOR = np.array((40, 0, 80), dtype=np.float64)
+MID_COLOR = np.array((128, 0, 128), dtype=np.float64)
+BOTTOM_COLOR = np.array((30, 144, 255), dtype=np.float64)
+
+# The wave repeats every 2*pi, so one turn is split into this many cached strips
+PHASE_STEPS = 256
+
+_gradient_strips = {}
+
+
+def gradient_colors(phase, height, wave):
+    # Row colours for one frame, same blend the old per-row loops did
+    y = np.arange(height)
+    blend = np.clip(y / height + np.sin(phase + y * 0.01) * wave, 0, 1)
+    lower = (blend < 0.5)[:, None]
+    ratio = np.where(lower[:, 0], blend * 2, (blend - 0.5) * 2)[:, None]
+    start = np.where(lower, TOP_COLOR, MID_COLOR)
+    end = np.where(lower, MID_COLOR, BOTTOM_COLOR)
+    return (start * (1 - ratio) + end * ratio).astype(np.uint8)
+
+
+def gradient_strip(surface, tick, wave):
+    # 1 pixel wide column for this point of the animation, built once per phase step
+    step = int((tick % (2 * math.pi)) / (2 * math.pi) * PHASE_STEPS) % PHASE_STEPS
+    height = surface.get_height()
+    key = (step, wave, height, surface.get_bitsize())
+    strip = _gradient_strips.get(key)
+    if strip is None:
+        colors = gradient_colors(step * 2 * math.pi / PHASE_STEPS, height, wave)
+        strip = pygame.Surface((1, height), 0, surface)
+        pygame.surfarray.blit_array(strip, colors[None, :, :])
+        _gradient_strips[key] = strip
+    return strip
+
+
+def draw_gradient_background(surface, tick, wave=0.1):
+    """Fill surface with the animated menu gradient.
+
+    Shared by every menu screen: the column is computed with NumPy (and
+    cached per phase) and stretched across the surface in one call.
+    """
+    strip = gradient_strip(surface, tick, wave)
+    pygame.transform.scale(strip, surface.get_size(), surface)
+
+
+# Particle speeds and lifetimes are per step of the old 7 FPS game loop. Each
+# update() moves them by however many of those steps the frame took, so they
+# look the same at any frame rate.
+PARTICLE_STEP = 1 / 7
+# The first frame after a pause (menus, countdown) moves them at most this far, in seconds
+MAX_PARTICLE_DT = 0.25
+
+
+class StepClock:
+    """Particle steps elapsed since the previous call, 0 on the first one."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.last = None
+
+    def __call__(self):
+        now = self.clock()
+        dt = 0.0 if self.last is None else min(now - self.last, MAX_PARTICLE_DT)
+        self.last = now
+        return dt / PARTICLE_STEP
+
+
+class ParticlePool:
+    """Burst particles in fixed-capacity NumPy arrays.
+
+    Slots [0, count) are alive. Moving and ageing is one vectorised update,
+    expired particles are swap-removed with live ones from the end, and
+    bursts that would go past capacity are simply cut short, so memory and
+    per-frame cost stay flat however long a session runs.
+    """
+
+    def __init__(self, capacity=256, clock=time.perf_counter):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.life = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.int32)
+        self.steps = StepClock(clock)
+
+    def emit(self, x, y, amount, life, rng=random):
+        k = min(amount, self.capacity - self.count)
+        if k <= 0:
+            return
+        s = slice(self.count, self.count + k)
+        self.pos[s] = (x, y)
+        self.vel[s] = [(rng.uniform(-2, 2), rng.uniform(-2, 2)) for _ in range(k)]
+        self.size[s] = [rng.randint(2, 4) for _ in range(k)]
+        self.color[s] = [(rng.randint(200, 255), rng.randint(100, 200), rng.randint(50, 150)) for _ in range(k)]
+        self.life[s] = life
+        self.count += k
+
+    def update(self, steps=None):
+        # steps defaults to the time since the last update, see PARTICLE_STEP
+        steps = self.steps() if steps is None else steps
+        n = self.count
+        self.pos[:n] += self.vel[:n] * steps
+        self.life[:n] -= steps
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if dead.size:
+            alive = n - dead.size
+            # Live particles past the new end fill the holes left below it
+            holes = dead[dead < alive]
+            movers = np.setdiff1d(np.arange(alive, n), dead, assume_unique=True)
+            for arr in (self.pos, self.vel, self.size, self.life, self.color):
+                arr[holes] = arr[movers]
+            self.count = alive
+
+    def draw(self, surface, offset=(0, 0)):
+        # offset moves world positions to the screen when a camera is scrolled
+        n = self.count
+        dx, dy = offset
+        for (x, y), size, color in zip(self.pos[:n].astype(int).tolist(), self.size[:n].tolist(), self.color[:n].tolist()):
+            pygame.draw.circle(surface, color, (x + dx, y + dy), size)
+
+    def rects(self):
+        # Screen area each live particle covers, for dirty-rect rendering
+        n = self.count
+        return [pygame.Rect(x - size, y - size, size * 2 + 1, size * 2 + 1)
+                for (x, y), size in zip(self.pos[:n].astype(int).tolist(), self.size[:n].tolist())]
+
+
+class BackgroundParticles:
+    """The slow grey specks drifting left behind the board, wrapping around at the edge."""
+
+    def __init__(self, amount, width, height, rng=random, clock=time.perf_counter):
+        self.width = width
+        self.height = height
+        self.rng = rng
+        self.steps = StepClock(clock)
+        self.x = np.array([rng.randint(0, width) for _ in range(amount)], dtype=np.float64)
+        self.y = np.array([rng.randint(0, height) for _ in range(amount)], dtype=np.float64)
+        self.size = [rng.randint(1, 3) for _ in range(amount)]
+        self.speed = np.array([rng.uniform(0.1, 0.5) for _ in range(amount)])
+
+    def update(self, steps=None):
+        self.x -= self.speed * (self.steps() if steps is None else steps)
+        for i in np.flatnonzero(self.x < 0).tolist():
+            self.x[i] = self.width
+            self.y[i] = self.rng.randint(0, self.height)
+
+    def draw(self, surface):
+        for x, y, size in zip(self.x.astype(int).tolist(), self.y.astype(int).tolist(), self.size):
+            pygame.draw.circle(surface, (80, 80, 80), (x, y), size)
+
+
+class TextCache:
+    """LRU cache of rendered text, keyed by (font, text, colour).
+
+    HUD strings and the target word repeat frame after frame, so they only
+    get rasterised when they actually change. hits / misses show whether
+    font rendering is still happening per frame.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces)}
+
+
+def build_tile_atlas(font, grid_size, tiles):
+    """Pre-render board tiles (rounded background + glyph) into one atlas surface.
+
+    tiles maps a key to (background colour, glyph, glyph colour, glyph offset).
+    Returns key -> subsurface, each blitted at the cell's top-left corner.
+    Glyphs may be bigger than a cell, so a tile grows to fit its glyph.
+    """
+    glyphs = {}
+    sizes = {}
+    for key, (bg, text, color, (dx, dy)) in tiles.items():
+        glyph = font.render(text, True, color)
+        glyphs[key] = glyph
+        sizes[key] = (max(grid_size, dx + glyph.get_width()), max(grid_size, dy + glyph.get_height()))
+    atlas = pygame.Surface((sum(w for w, h in sizes.values()), max(h for w, h in sizes.values())), pygame.SRCALPHA)
+    result = {}
+    x = 0
+    for key, (bg, text, color, (dx, dy)) in tiles.items():
+        w, h = sizes[key]
+        tile = atlas.subsurface((x, 0, w, h))
+        pygame.draw.rect(tile, bg, pygame.Rect(0, 0, grid_size, grid_size), border_radius=3)
+        tile.blit(glyphs[key], (dx, dy))
+        result[key] = tile
+        x += w
+    return result
+
+
+class DirtyRects:
+    """Remembers what was drawn where last frame and collects the rects that changed.
+
+    sync() takes this frame's {key: what is drawn there} map; any key whose
+    value changed, appeared or disappeared has its rect marked. take() hands
+    the marked rects to the caller to repaint and push with display.update.
+    """
+
+    def __init__(self):
+        self.drawn = {}
+        self.rects = []
+        self.full = True
+
+    def reset(self):
+        # Next frame repaints everything, e.g. after something drew over the screen
+        self.drawn = {}
+        self.rects = []
+        self.full = True
+
+    def mark(self, rect):
+        self.rects.append(rect)
+
+    def sync(self, items, rect_for):
+        drawn = self.drawn
+        for key, value in items.items():
+            if drawn.get(key) != value:
+                self.rects.append(rect_for(key))
+        for key in drawn.keys() - items.keys():
+            self.rects.append(rect_for(key))
+        self.drawn = items
+
+    def take(self):
+        rects, self.rects = self.rects, []
+        return rects
+
+
+class StaticLayer:
+    """Letters and water/fire/pit tiles pre-drawn onto one transparent surface.
+
+    The layout only changes when letters/obstacles respawn (a new version)
+    or when a letter gets eaten, so the layer is rebuilt on respawn, patched
+    cell by cell when letters disappear, and otherwise costs a single blit
+    per frame. Moving things (snakes, eagles) are drawn on top of it.
+    """
+
+    def __init__(self, size, atlas, grid_size):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.atlas = atlas
+        self.grid_size = grid_size
+        self.tiles = {}
+        self.letters = set()
+        self.version = None
+        self.rebuilds = 0
+        self.patches = 0
+
+    def footprint(self, pos, key):
+        return pygame.Rect(pos, self.atlas[key].get_size())
+
+    def update(self, version, letters, obstacles):
+        if version != self.version:
+            self.rebuild(version, letters, obstacles)
+        elif len(letters) != len(self.letters):
+            remaining = {(x, y) for x, y, ch in letters}
+            for pos in self.letters - remaining:
+                self.remove(pos)
+            self.letters = remaining
+
+    def rebuild(self, version, letters, obstacles):
+        self.rebuilds += 1
+        self.version = version
+        self.tiles = {(x, y): ch for x, y, ch in letters}
+        self.letters = set(self.tiles)
+        self.tiles.update(((x, y), t) for x, y, t in obstacles if t != "eagle")
+        self.surface.fill((0, 0, 0, 0))
+        for pos, key in self.tiles.items():
+            self.surface.blit(self.atlas[key], pos)
+
+    def remove(self, pos):
+        # Clear the tile's area, then redraw the neighbours that overlap it
+        self.patches += 1
+        area = self.footprint(pos, self.tiles.pop(pos))
+        self.surface.set_clip(area)
+        self.surface.fill((0, 0, 0, 0))
+        for other, key in self.tiles.items():
+            if area.colliderect(self.footprint(other, key)):
+                self.surface.blit(self.atlas[key], other)
+        self.surface.set_clip(None)
+
+    def draw(self, surface, area=None):
+        if area is None:
+            surface.blit(self.surface, (0, 0))
+        else:
+            surface.blit(self.surface, area, area)
+
+
+class CachedLayer:
+    """A surface allocated once and redrawn only when its key changes.
+
+    update(key, draw, *args) clears the surface and calls draw(surface, *args)
+    if key differs from last time; otherwise nothing is rendered or
+    allocated and draw() is a plain blit. rebuilds counts the redraws.
+    """
+
+    def __init__(self, size, fill=(0, 0, 0, 0)):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.fill = fill
+        self.key = None
+        self.rebuilds = 0
+
+    def update(self, key, draw, *args):
+        if key != self.key:
+            self.key = key
+            self.rebuilds += 1
+            self.surface.fill(self.fill)
+            draw(self.surface, *args)
+
+    def invalidate(self):
+        self.key = None
+
+    def draw(self, surface, pos=(0, 0)):
+        surface.blit(self.surface, pos)
+
+
+def interpolate(previous, current, alpha):
+    """Positions alpha (0..1) of the way from previous to current, matched up index by index.
+
+    A snake's segment k slides from where segment k was to where it is now;
+    segments with no previous position (a snake that just grew) stay put.
+    """
+    out = []
+    for k, (x, y) in enumerate(current):
+        if k < len(previous):
+            px, py = previous[k]
+            out.append((round(px + (x - px) * alpha), round(py + (y - py) * alpha)))
+        else:
+            out.append((x, y))
+    return out
+
+
+class Camera:
+    """The part of a world bigger than the screen shown in one view.
+
+    view is the screen rect it is drawn into. follow() centres it on a world
+    position, clamped so it never shows past the edges of the world (a world
+    narrower than the view is centred instead).
+    """
+
+    def __init__(self, view, world_size):
+        self.view = pygame.Rect(view)
+        self.world_width, self.world_height = world_size
+        self.x = 0
+        self.y = 0
+
+    def follow(self, pos):
+        self.x = self.clamp(pos[0] - self.view.width // 2, self.world_width, self.view.width)
+        self.y = self.clamp(pos[1] - self.view.height // 2, self.world_height, self.view.height)
+
+    @staticmethod
+    def clamp(start, world, view):
+        if world <= view:
+            return (world - view) // 2
+        return min(max(start, 0), world - view)
+
+    @property
+    def offset(self):
+        # Add to a world position to get its screen position
+        return self.view.x - self.x, self.view.y - self.y
+
+    def visible(self, pos, margin=0):
+        # Whether something at world pos (up to margin pixels big) shows in the view
+        return (self.x - margin <= pos[0] < self.x + self.view.width
+                and self.y - margin <= pos[1] < self.y + self.view.height)
+
+    def cells(self, grid_size):
+        # Range of cell columns and rows the view shows (c0, r0, c1, r1), for grids and culling
+        return (max(self.x, 0) // grid_size, max(self.y, 0) // grid_size,
+                min(self.x + self.view.width, self.world_width) // grid_size + 1,
+                min(self.y + self.view.height, self.world_height) // grid_size + 1)
@@ -0,0 +1,127 @@
+import array
+import mmap
+import os
+import random
+import struct
+
+from dictionary import DICTIONARY_PATH, valid_words
+
+# Target words sorted into difficulty tiers, so a new word is one random index
+# into the right tier instead of copying a set into a list every time.
+#
+# A word's tier grows with its length and with how rare its letters are
+# (Scrabble letter values). The tiers are stored as arrays of word numbers in
+# words.dat and cached next to it in words.pool, rebuilt whenever words.dat
+# changes.
+
+POOL_PATH = os.path.join(os.path.dirname(DICTIONARY_PATH), "words.pool")
+
+POOL_MAGIC = b"WSPOOL1\n"
+POOL_HEADER = struct.Struct("<8sQQI")
+
+TIERS = 5
+MIN_LENGTH = 3
+MAX_LENGTH = 8
+
+LETTER_RARITY = {
+    "a": 1, "b": 3, "c": 3, "d": 2, "e": 1, "f": 4, "g": 2, "h": 4, "i": 1, "j": 8, "k": 5, "l": 1, "m": 3,
+    "n": 1, "o": 1, "p": 3, "q": 10, "r": 1, "s": 1, "t": 1, "u": 1, "v": 4, "w": 4, "x": 8, "y": 4, "z": 10,
+}
+
+# Every this many points the game gets one step harder
+POINTS_PER_LEVEL = 10
+
+
+def level(score):
+    return score // POINTS_PER_LEVEL
+
+
+def obstacle_count(score):
+    # Same pace as the old 5 + score // 5
+    return 5 + 2 * level(score)
+
+
+def word_tier(word):
+    """Tier of word, or None if it can't be a target (wrong length, not plain a-z)."""
+    if not MIN_LENGTH <= len(word) <= MAX_LENGTH or not all(c in LETTER_RARITY for c in word):
+        return None
+    rare = sum(LETTER_RARITY[c] for c in word) > 2 * len(word)
+    return min(TIERS - 1, len(word) - MIN_LENGTH + rare)
+
+
+class WordPool:
+    """Random target words by tier, each draw O(1).
+
+    Reads the tier index from words.pool (building it from the dictionary
+    the first time); with no dictionary at all it falls back to the given
+    built-in words. A tier without words borrows from the nearest easier one.
+    """
+
+    def __init__(self, words=valid_words, fallback=(), path=POOL_PATH):
+        self.words = words
+        self.fallback = sorted(fallback)
+        self.path = path
+        self.tiers = None
+
+    def load(self):
+        if self.tiers is not None:
+            return
+        if len(self.words):
+            self.tiers = self.read() or self.build()
+        else:
+            self.tiers = [[] for _ in range(TIERS)]
+            for w in self.fallback:
+                tier = word_tier(w)
+                if tier is not None:
+                    self.tiers[tier].append(w)
+
+    def source_stamp(self):
+        st = os.stat(self.words.path)
+        return st.st_size, st.st_mtime_ns
+
+    def read(self):
+        # Cached tiers, or None if there is no cache or words.dat changed since
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= POOL_HEADER.size:
+            return None
+        with open(self.path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, mtime, tiers = POOL_HEADER.unpack_from(data, 0)
+        if magic != POOL_MAGIC or (size, mtime) != self.source_stamp() or tiers != TIERS:
+            return None
+        start = POOL_HEADER.size + (tiers + 1) * 4
+        bounds = memoryview(data)[POOL_HEADER.size:start].cast("I")
+        ids = memoryview(data)[start:].cast("I")
+        return [ids[bounds[t]:bounds[t + 1]] for t in range(tiers)]
+
+    def build(self):
+        tiers = [array.array("I") for _ in range(TIERS)]
+        for k in range(len(self.words)):
+            tier = word_tier(self.words.word(k).decode("utf-8"))
+            if tier is not None:
+                tiers[tier].append(k)
+        bounds = [0]
+        for ids in tiers:
+            bounds.append(bounds[-1] + len(ids))
+        try:
+            with open(self.path, "wb") as f:
+                f.write(POOL_HEADER.pack(POOL_MAGIC, *self.source_stamp(), TIERS))
+                f.write(struct.pack(f"<{len(bounds)}I", *bounds))
+                for ids in tiers:
+                    f.write(ids.tobytes())
+        except OSError:
+            # Read-only install: keep the index in memory for this run
+            pass
+        return tiers
+
+    def sizes(self):
+        self.load()
+        return [len(t) for t in self.tiers]
+
+    def sample(self, tier=0, rng=random):
+        self.load()
+        for t in range(min(tier, TIERS - 1), -1, -1):
+            words = self.tiers[t]
+            if len(words):
+                w = words[rng.randrange(len(words))]
+                return w if isinstance(w, str) else self.words.word(w).decode("utf-8")
+        raise ValueError("no target words available")